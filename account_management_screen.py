@@ -7,14 +7,22 @@ from kivy.properties import (
     BooleanProperty,
 )
 from kivy.uix.boxlayout import BoxLayout
-from kivy.uix.label import Label
-from kivy.uix.button import Button
-from kivy.uix.textinput import TextInput
-from kivy.uix.popup import Popup
-from kivy.metrics import dp
+from kivy.factory import Factory  # Popups are dynamic classes defined in budget.kv
 from kivy.clock import Clock
+from kivy.logger import Logger
+from sqlalchemy import select, insert, update, delete, func
+from sqlalchemy.exc import IntegrityError
+
+from database import (
+    Account,
+    Transaction,
+    SnapshotEntry,
+    DB_READY,
+)
+from list_screen import RecycleListScreenMixin
 
-from database import SessionLocal, Account, Transaction, SnapshotEntry
+# Number of accounts fetched per page as the RecycleView is scrolled
+ACCOUNT_PAGE_SIZE = 50
 
 
 class AccountListItem(BoxLayout):
@@ -24,19 +32,31 @@ class AccountListItem(BoxLayout):
     account_name = StringProperty("")
     selected = BooleanProperty(False)
 
+    # Clock frame of the last handled tap, shared by all rows so that a burst of
+    # touch events (e.g. a finger drag) triggers at most one selection per frame
+    _last_selection_frame = -1
+    # The account_management screen, resolved on the first touch of any row
+    _screen_ref = None
+
     def on_touch_down(self, touch):
         """Handles touch events for this specific list item widget."""
         # Check if the touch coordinates fall within the bounds of this widget
         if self.collide_point(*touch.pos):
-            print(
-                f"AccountListItem touched: ID {self.account_id}, Name {self.account_name}"
-            )
+            if AccountListItem._last_selection_frame == Clock.frames:
+                return True  # Already handled a tap this frame
+            AccountListItem._last_selection_frame = Clock.frames
+
             # Find the running app instance, access its root (ScreenManager),
-            # get the target screen, and call the handler method.
+            # and get the target screen once; every row reuses the reference.
+            # The root isn't built yet when rows are first created, so this
+            # can't be done up front in __init__/on_kv_post.
+            screen = AccountListItem._screen_ref
+            if screen is None:
+                screen = AccountListItem._screen_ref = (
+                    App.get_running_app().root.get_screen("account_management")
+                )
             # Pass the data associated with *this specific* widget instance.
-            App.get_running_app().root.get_screen(
-                "account_management"
-            ).handle_selection(self.account_id, self.account_name, self)
+            screen.handle_selection(self.account_id, self.account_name, self)
             # Return True to indicate we've handled this touch event
             # and it shouldn't be processed further (prevents scrolling while tapping).
             return True
@@ -45,107 +65,226 @@ class AccountListItem(BoxLayout):
         return super().on_touch_down(touch)
 
 
-class AccountManagementScreen(Screen):
+class AccountManagementScreen(RecycleListScreenMixin, Screen):
     account_recycle_view = ObjectProperty(None)  # To hold the RecycleView
     status_label = ObjectProperty(None)  # For messages
     selected_account_data = ObjectProperty(None, allownone=True)
 
+    recycle_view_attr = "account_recycle_view"
+    row_id_key = "account_id"
+    row_name_key = "account_name"
+    log_title = "AccountManagement"
+
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
+        # Dependency counts loaded with the account list:
+        # {account_id: (transaction_count, snapshot_count)}
+        self._dep_cache = {}
+        # Keyset pagination state: name of the last account fetched from the DB
+        # and whether the last page has been reached
+        self._accounts_cursor = None
+        self._accounts_exhausted = False
+        # A page fetch is running on the DB worker (at most one at a time), and
+        # a counter bumped on every reload so stale pages can be recognised
+        self._page_in_flight = False
+        self._page_generation = 0
+        # Index of the selected row in the RecycleView data (None if nothing selected)
+        self._selected_idx = None
+        # {account_id: index in the RecycleView data} for O(1) row lookups
+        self._id_index = {}
+        # Reusable next-frame trigger for _setup_ui (avoids a new ClockEvent per entry)
+        self._setup_trigger = Clock.create_trigger(self._setup_ui, 0)
+        # Dialogs are built on first use and reused on later opens
+        self._add_popup = None
+        self._edit_popup = None
+        self._delete_popup = None
+        self._delete_blocked_popup = None
+        # Account the edit/delete dialog is currently acting on
+        self._edit_target = None
+        self._delete_target = None
 
     def on_enter(self, *args):
         """Called when the screen is displayed."""
-        print("Entering Account Management Screen.")
+        Logger.debug("AccountManagement: Entering screen")
         self.deselect_account()  # Clear selection when entering
-        Clock.schedule_once(self._setup_ui, 0)
+        self._setup_trigger()
 
     def _setup_ui(self, dt):
         if not self.account_recycle_view or not self.status_label:
-            print("Error: Account Management UI elements not ready.")
+            Logger.error("AccountManagement: UI elements not ready")
             # Maybe add default text to status_label if it exists
             if self.status_label:
                 self.status_label.text = "Error loading UI."
             return
+        if not DB_READY.is_set():
+            # init_db() is still running on the DB worker; retry next frame
+            self._setup_trigger()
+            return
         self.status_label.text = "Manage your accounts."
         self.load_accounts_for_rv()
 
+    def on_account_recycle_view(self, instance, rv):
+        """Loads further pages of accounts as the list is scrolled to the bottom."""
+        if rv is not None:
+            rv.bind(scroll_y=self._on_accounts_scroll)
+
+    def _on_accounts_scroll(self, rv, scroll_y):
+        # scroll_y runs from 1 (top) to 0 (bottom)
+        if scroll_y <= 0.1 and not self._accounts_exhausted:
+            self.load_next_accounts_page()
+
     def load_accounts_for_rv(self):
-        """Loads accounts from DB and prepares data for RecycleView."""
+        """Loads the first page of accounts from DB and prepares data for RecycleView.
+        Only used on screen entry; add/edit/delete patch the data in place."""
         if not self.account_recycle_view:
             self.status_label.text = "Error: RecycleView not found."
             return
 
-        print("Loading accounts for RecycleView...")
-        try:
-            with SessionLocal() as db:
-                accounts = db.query(Account).order_by(Account.name).all()
-                # Data now only needs basic info, selection state is handled by interaction
-                self.account_recycle_view.data = [
-                    {
-                        "account_id": acc.id,
-                        "account_name": acc.name,
-                        "selected": False,
-                    }  # Add 'selected' key
-                    for acc in accounts
-                ]
+        Logger.debug("AccountManagement: Loading accounts for RecycleView")
+        self._accounts_cursor = None
+        self._accounts_exhausted = False
+        self._dep_cache = {}
+        self._selected_idx = None
+        self._id_index = {}
+        # Results of page requests made before this reload are dropped
+        self._page_generation += 1
+        self._page_in_flight = False
+        self.account_recycle_view.data = []
+        self.load_next_accounts_page()
+
+    def load_next_accounts_page(self):
+        """
+        Fetches the next ACCOUNT_PAGE_SIZE accounts (by name, after the cursor)
+        with their dependency counts on the DB worker, then appends them to the
+        RecycleView data. Does nothing while a page is already being fetched.
+        """
+        if self._accounts_exhausted or self._page_in_flight:
+            return
+        self._page_in_flight = True
+        cursor = self._accounts_cursor
+        generation = self._page_generation
+
+        def work(db):
+            # Only id and name are displayed, so select plain column rows
+            # rather than hydrating full Account objects
+            stmt = select(Account.id, Account.name).order_by(Account.name)
+            if cursor is not None:
+                stmt = stmt.where(Account.name > cursor)
+            accounts = db.execute(stmt.limit(ACCOUNT_PAGE_SIZE)).all()
+            account_ids = [acc.id for acc in accounts]
+
+            # Fetch dependency counts for the whole page up front (one grouped
+            # query per table) so delete confirmation needs no DB access.
+            transaction_counts = dict(
+                db.execute(
+                    select(Transaction.account_id, func.count())
+                    .where(Transaction.account_id.in_(account_ids))
+                    .group_by(Transaction.account_id)
+                ).all()
+            )
+            snapshot_counts = dict(
+                db.execute(
+                    select(SnapshotEntry.account_id, func.count())
+                    .where(SnapshotEntry.account_id.in_(account_ids))
+                    .group_by(SnapshotEntry.account_id)
+                ).all()
+            )
+            return accounts, transaction_counts, snapshot_counts
+
+        def done(result, error):
+            if generation != self._page_generation:
+                return  # The list was reloaded while this page was loading
+            self._page_in_flight = False
+            if error is not None:
+                error_msg = f"Error loading accounts: {error}"
+                self.status_label.text = error_msg
+                Logger.error("AccountManagement: %s", error_msg)
+                return
+
+            accounts, transaction_counts, snapshot_counts = result
+            if len(accounts) < ACCOUNT_PAGE_SIZE:
+                self._accounts_exhausted = True
+            if accounts:
+                self._accounts_cursor = accounts[-1].name
+
+            for acc in accounts:
+                self._dep_cache[acc.id] = (
+                    transaction_counts.get(acc.id, 0),
+                    snapshot_counts.get(acc.id, 0),
+                )
+            # Data now only needs basic info, selection state is handled by interaction
+            data = self.account_recycle_view.data
+            start = len(data)
+            data.extend(
+                {
+                    "account_id": acc.id,
+                    "account_name": acc.name,
+                    "selected": False,
+                }
+                for acc in accounts
+            )
+            self._reindex_rows(start)
+            if cursor is None:  # First page
                 self.status_label.text = f"Loaded {len(accounts)} accounts."
                 self.deselect_account()  # Ensure nothing is selected programmatically on load
 
-        except Exception as e:
-            error_msg = f"Error loading accounts: {e}"
-            self.status_label.text = error_msg
-            print(error_msg)
-
-        # Refresh the view after updating data
-        self.account_recycle_view.refresh_from_data()
+        self._run_in_background(work, done)
 
     def handle_selection(self, account_id, account_name, view_instance):
         """Manages selecting/deselecting items in the RecycleView."""
-        print(f"Selection attempt on ID: {account_id}, Name: {account_name}")
-
-        # Update the underlying data list to reflect selection changes
-        new_data = []
-        item_selected = False
-        for item_data in self.account_recycle_view.data:
-            current_id = item_data["account_id"]
-            # Check if this is the item that was clicked
-            if current_id == account_id:
-                # Toggle selection for this item
-                item_data["selected"] = not item_data["selected"]
-                if item_data["selected"]:
-                    # If this item is now selected, store its data and mark item_selected
-                    self.selected_account_data = {
-                        "id": account_id,
-                        "name": account_name,
-                    }
-                    self.status_label.text = f"Selected: {account_name}"
-                    item_selected = True
-                else:
-                    # If it was deselected, clear stored data
-                    self.deselect_account()  # Use helper to clear status too
-            else:
-                # Deselect all other items (for single selection)
-                item_data["selected"] = False
-            new_data.append(item_data)
+        Logger.debug("AccountManagement: Selection attempt on ID %s", account_id)
+
+        idx = self._find_account_index(account_id)
+        if idx is None:
+            return True
 
-        # If nothing ended up selected (because the clicked item was deselected)
-        if not item_selected:
-            self.deselect_account()  # Ensure selected_account_data is cleared
+        if self.account_recycle_view.data[idx]["selected"]:
+            # Tapping the selected row deselects it (helper clears status too)
+            self.deselect_account()
+            return True
 
-        # Update the RecycleView's data property
-        self.account_recycle_view.data = new_data
-        # Refreshing the view is often needed after data change
-        self.account_recycle_view.refresh_from_data()  # May not be needed if viewclass updates visuals correctly
+        # Single selection: only the previously selected row and the tapped row
+        # change, so replace just those two entries instead of rebuilding data
+        if self._selected_idx is not None:
+            self._set_row_selected(self._selected_idx, False)
+        self._set_row_selected(idx, True)
+        self._selected_idx = idx
+        self.selected_account_data = {
+            "id": account_id,
+            "name": account_name,
+        }
+        self._set_status(f"Selected: {account_name}")
 
         return True  # Indicate touch was handled
 
+    def _find_account_index(self, account_id):
+        """Returns the index of an account's row in the RecycleView data, or None."""
+        return self._id_index.get(account_id)
+
+    def _insert_account_row(self, item_data):
+        """
+        Inserts a row into the RecycleView data, keeping it sorted by name.
+        Rows that sort after the pagination cursor are skipped while more pages
+        remain, since they will be fetched with a later page.
+        Returns True if the row was inserted.
+        """
+        name = item_data["account_name"]
+        if not self._accounts_exhausted and (
+            self._accounts_cursor is None or name > self._accounts_cursor
+        ):
+            return False
+        self._insert_row(item_data)
+        return True
+
     def deselect_account(self):
         """Helper to clear selection state."""
         self.selected_account_data = None
+        if self._selected_idx is not None:
+            # Clear the highlight on the previously selected row (single-select)
+            self._set_row_selected(self._selected_idx, False)
+            self._selected_idx = None
         if self.status_label and not self.status_label.text.startswith("Error"):
-            self.status_label.text = "Manage your accounts. Select one to edit/delete."
-        # You might also iterate through data and set 'selected' to False if needed,
-        # though handle_selection should manage this for single-select.
+            self._set_status("Manage your accounts. Select one to edit/delete.")
 
     def get_selected_account(self):
         """Returns the data dict of the selected account or None."""
@@ -154,65 +293,60 @@ class AccountManagementScreen(Screen):
 
     def open_add_account_popup(self):
         """Opens a popup to add a new account."""
-        # --- Basic Popup Implementation ---
-        content = BoxLayout(orientation="vertical", padding=dp(10), spacing=dp(10))
-        popup_label = Label(text="Enter new account name:")
-        name_input = TextInput(multiline=False, hint_text="Account Name")
-        button_box = BoxLayout(size_hint_y=None, height=dp(50), spacing=dp(10))
-        save_button = Button(text="Save")
-        cancel_button = Button(text="Cancel")
-        button_box.add_widget(save_button)
-        button_box.add_widget(cancel_button)
-
-        content.add_widget(popup_label)
-        content.add_widget(name_input)
-        content.add_widget(button_box)
-
-        popup = Popup(title="Add Account", content=content, size_hint=(0.7, 0.4))
-
-        # --- Button Actions ---
-        def save_action(instance):
-            account_name = name_input.text.strip()
-            if account_name:
-                self.add_account(account_name)
-                popup.dismiss()
-            else:
-                # Optional: Add feedback in the popup or main screen
-                print("Account name cannot be empty.")
-                self.status_label.text = "Account name cannot be empty."
+        # Layout lives in budget.kv (<AddAccountPopup@Popup>); built once, reused on later opens
+        if self._add_popup is None:
+            self._add_popup = Factory.AddAccountPopup()
+            self._add_popup.ids.save_button.bind(on_press=self._save_add_popup)
+
+        self._add_popup.ids.name_input.text = ""
+        self._add_popup.open()
+
+    def _save_add_popup(self, instance):
+        account_name = self._add_popup.ids.name_input.text.strip()
+        if account_name:
+            self.add_account(account_name)
+            self._add_popup.dismiss()
+        else:
+            # Optional: Add feedback in the popup or main screen
+            self.status_label.text = "Account name cannot be empty."
 
-        save_button.bind(on_press=save_action)
-        cancel_button.bind(on_press=popup.dismiss)
+    def add_account(self, name):
+        """Adds a new account to the database (the write runs on a worker thread)."""
 
-        popup.open()
+        Logger.debug("AccountManagement: Adding account %r", name)
 
-    def add_account(self, name):
-        """Adds a new account to the database."""
-
-        print(f"Attempting to add account: {name}")
-        try:
-            with SessionLocal() as db:
-                # Check if account already exists (optional but good practice)
-                exists = (
-                    db.query(Account).filter(Account.name == name).first()
-                )  # Use Account model
-                if exists:
-                    self.status_label.text = f"Account '{name}' already exists."
-                    print(f"Account '{name}' already exists.")
-                    return
-
-                new_account = Account(name=name)  # Create new Account object
-                db.add(new_account)
+        def work(db):
+            # The unique index on Account.name rejects duplicates, no pre-check needed
+            # RETURNING hands back the new id from the INSERT itself
+            try:
+                new_id = db.execute(
+                    insert(Account).values(name=name).returning(Account.id)
+                ).scalar_one()
                 db.commit()
-                print(f"Account '{name}' added successfully.")
-                self.status_label.text = f"Account '{name}' added."
-                self.load_accounts_for_rv()  # Refresh the list
+            except IntegrityError:
+                db.rollback()
+                return None
+            return new_id
 
-        except Exception as e:
-            db.rollback()  # Rollback on error
-            error_msg = f"Error adding account '{name}': {e}"
-            self.status_label.text = error_msg
-            print(error_msg)
+        def done(new_id, error):
+            if error is not None:
+                error_msg = f"Error adding account '{name}': {error}"
+                self.status_label.text = error_msg
+                Logger.error("AccountManagement: %s", error_msg)
+                return
+            if new_id is None:
+                self.status_label.text = f"Account '{name}' already exists."
+                return
+
+            Logger.info("AccountManagement: Account %r added", name)
+            self.status_label.text = f"Account '{name}' added."
+            # Insert the new row in place instead of reloading the whole list
+            self._insert_account_row(
+                {"account_id": new_id, "account_name": name, "selected": False}
+            )
+            self._dep_cache[new_id] = (0, 0)  # A brand new account has no links
+
+        self._run_in_background(work, done)
 
     def open_edit_account_popup(self):
         selected = self.get_selected_account()
@@ -223,88 +357,105 @@ class AccountManagementScreen(Screen):
 
         account_id = selected["id"]
         account_name = selected["name"]
-        print(f"Opening edit popup for Account ID: {account_id}, Name: {account_name}")
+        Logger.debug("AccountManagement: Opening edit popup for ID %s", account_id)
 
         try:  # Add error handling
-            content = BoxLayout(orientation="vertical", padding=dp(10), spacing=dp(10))
-            popup_label = Label(text=f"Enter new name for '{account_name}':")
-            name_input = TextInput(
-                text=account_name, multiline=False, hint_text="New Account Name"
+            # Layout lives in budget.kv (<EditAccountPopup@Popup>)
+            if self._edit_popup is None:
+                self._edit_popup = Factory.EditAccountPopup()
+                self._edit_popup.ids.save_button.bind(on_press=self._save_edit_popup)
+
+            # Point the reused dialog at the selected account
+            self._edit_target = (account_id, account_name)
+            self._edit_popup.ids.prompt_label.text = (
+                f"Enter new name for '{account_name}':"
             )
-            button_box = BoxLayout(size_hint_y=None, height=dp(50), spacing=dp(10))
-            save_button = Button(text="Save Changes")
-            cancel_button = Button(text="Cancel")
-            button_box.add_widget(save_button)
-            button_box.add_widget(cancel_button)
-
-            content.add_widget(popup_label)
-            content.add_widget(name_input)
-            content.add_widget(button_box)
-
-            popup = Popup(title="Edit Account", content=content, size_hint=(0.7, 0.4))
-
-            def save_edit_action(instance):
-                new_name = name_input.text.strip()
-                if new_name and new_name != account_name:
-                    self.edit_account(account_id, new_name)
-                    popup.dismiss()
-                elif not new_name:
-                    if self.status_label:
-                        self.status_label.text = "Account name cannot be empty."
-                else:  # Name didn't change or was empty
-                    popup.dismiss()
-
-            save_button.bind(on_press=save_edit_action)
-            cancel_button.bind(on_press=popup.dismiss)
-
-            popup.open()
-
-        except Exception as e:
-            print(f"Error opening Edit Account popup: {e}")
+            self._edit_popup.ids.name_input.text = account_name
+            self._edit_popup.open()
+
+        except Exception:
+            Logger.exception("AccountManagement: Error opening Edit Account popup")
             if self.status_label:
                 self.status_label.text = "Error opening edit dialog."
 
+    def _save_edit_popup(self, instance):
+        account_id, account_name = self._edit_target
+        new_name = self._edit_popup.ids.name_input.text.strip()
+        if new_name and new_name != account_name:
+            self.edit_account(account_id, new_name)
+            self._edit_popup.dismiss()
+        elif not new_name:
+            if self.status_label:
+                self.status_label.text = "Account name cannot be empty."
+        else:  # Name didn't change or was empty
+            self._edit_popup.dismiss()
+
     def edit_account(self, account_id, new_name):
+        """Renames an account (the write runs on a worker thread)."""
         if not new_name:
             self.status_label.text = "New account name cannot be empty."
             return
 
-        print(f"Attempting to edit account ID {account_id} to '{new_name}'")
-        try:
-            with SessionLocal() as db:
-                # Check if another account with the new name already exists
-                exists = (
-                    db.query(Account)
-                    .filter(Account.name == new_name, Account.id != account_id)
-                    .first()
-                )
-                if exists:
-                    self.status_label.text = (
-                        f"Another account named '{new_name}' already exists."
-                    )
-                    print(f"Account '{new_name}' already exists.")
-                    return
+        Logger.debug(
+            "AccountManagement: Renaming account ID %s to %r", account_id, new_name
+        )
 
-                account_to_edit = (
-                    db.query(Account).filter(Account.id == account_id).first()
+        def work(db):
+            # UPDATE ... RETURNING tells us whether the row existed without loading it first
+            try:
+                updated_id = db.execute(
+                    update(Account)
+                    .where(Account.id == account_id)
+                    .values(name=new_name)
+                    .returning(Account.id)
+                ).scalar_one_or_none()
+                db.commit()
+            except IntegrityError:
+                # Another account already has this name (unique index on Account.name)
+                db.rollback()
+                return "exists"
+            return "updated" if updated_id is not None else "missing"
+
+        def done(outcome, error):
+            if error is not None:
+                error_msg = f"Error editing account ID {account_id}: {error}"
+                self.status_label.text = error_msg
+                Logger.error("AccountManagement: %s", error_msg)
+                return
+            if outcome == "exists":
+                self.status_label.text = (
+                    f"Another account named '{new_name}' already exists."
                 )
-                if account_to_edit:
-                    account_to_edit.name = new_name
-                    db.commit()
-                    print(f"Account ID {account_id} updated to '{new_name}'.")
-                    self.status_label.text = f"Account '{new_name}' updated."
-                    self.load_accounts_for_rv()  # Refresh list with new name
-                else:
-                    self.status_label.text = (
-                        f"Error: Account ID {account_id} not found for editing."
-                    )
-                    print(f"Account ID {account_id} not found.")
+                return
+            if outcome == "missing":
+                self.status_label.text = (
+                    f"Error: Account ID {account_id} not found for editing."
+                )
+                Logger.warning(
+                    "AccountManagement: Account ID %s not found for editing",
+                    account_id,
+                )
+                return
 
-        except Exception as e:
-            db.rollback()
-            error_msg = f"Error editing account ID {account_id}: {e}"
-            self.status_label.text = error_msg
-            print(error_msg)
+            Logger.info(
+                "AccountManagement: Account ID %s renamed to %r", account_id, new_name
+            )
+            self.status_label.text = f"Account '{new_name}' updated."
+            # Patch the existing row; re-insert it so the list stays sorted
+            idx = self._find_account_index(account_id)
+            if idx is not None:
+                item_data = self._remove_row(idx)
+                item_data["account_name"] = new_name
+                if not self._insert_account_row(item_data):
+                    # Renamed past the loaded pages; it reappears on scroll
+                    self.deselect_account()
+                elif item_data["selected"]:
+                    self.selected_account_data = {
+                        "id": account_id,
+                        "name": new_name,
+                    }
+
+        self._run_in_background(work, done)
 
     def confirm_delete_account(self):
         selected = self.get_selected_account()
@@ -315,145 +466,132 @@ class AccountManagementScreen(Screen):
 
         account_id = selected["id"]
         account_name = selected["name"]
-        print(
-            f"Opening delete confirmation for Account ID: {account_id}, Name: {account_name}"
+        Logger.debug(
+            "AccountManagement: Opening delete confirmation for ID %s", account_id
         )
 
         # --- Check dependencies FIRST ---
-        blocking_dependency_text = self.check_account_dependencies(account_id)
+        # The blocking transaction count and the snapshot count used for the
+        # cascade warning below both come from the cache, without DB access.
+        blocking_dependency_text, snapshot_count = self.check_account_dependencies(
+            account_id
+        )
 
         try:  # Add error handling
-            content = BoxLayout(orientation="vertical", padding=dp(10), spacing=dp(10))
-            popup = None  # Define popup variable
-
             if blocking_dependency_text:
                 # If dependencies exist, show warning and only an OK button
-                warning_label = Label(
-                    text=f"Cannot delete '{account_name}':\n{blocking_dependency_text}",
-                    halign="center",
-                )
-                ok_button = Button(text="OK", size_hint_y=None, height=dp(50))
-                content.add_widget(warning_label)
-                content.add_widget(ok_button)
-                popup = Popup(
-                    title="Deletion Prevented", content=content, size_hint=(0.7, 0.4)
+                # (<DeleteBlockedPopup@Popup> in budget.kv)
+                if self._delete_blocked_popup is None:
+                    self._delete_blocked_popup = Factory.DeleteBlockedPopup()
+
+                self._delete_blocked_popup.ids.message_label.text = (
+                    f"Cannot delete '{account_name}':\n{blocking_dependency_text}"
                 )
-                ok_button.bind(on_press=popup.dismiss)
+                self._delete_blocked_popup.open()
             else:
-                # No dependencies, show confirmation
-                snapshot_count = 0
-                try:
-                    with SessionLocal() as db_check:
-                        snapshot_count = (
-                            db_check.query(SnapshotEntry)
-                            .filter(SnapshotEntry.account_id == account_id)
-                            .count()
-                        )
-                except Exception as e_snap:
-                    print(f"Error checking snapshot count for account {account_id}: {e_snap}")
+                # No dependencies, show confirmation (<DeleteConfirmPopup@Popup> in budget.kv)
+                if self._delete_popup is None:
+                    self._delete_popup = Factory.DeleteConfirmPopup()
+                    self._delete_popup.ids.delete_button.bind(
+                        on_press=self._confirm_delete_popup
+                    )
 
                 confirm_message = f"Are you sure you want to delete account '{account_name}'?\nThis action cannot be undone."
                 if snapshot_count > 0:
                     # Add specific warning about snapshot deletion
                     confirm_message += f"\n\nWARNING: This will also delete {snapshot_count} associated balance snapshot(s)."
 
-                confirm_label = Label(text=confirm_message, halign="center")
-                button_box = BoxLayout(size_hint_y=None, height=dp(50), spacing=dp(10))
-                delete_button = Button(
-                    text="Delete", background_color=(1, 0, 0, 1)
-                )  # Red button
-                cancel_button = Button(text="Cancel")
-                button_box.add_widget(delete_button)
-                button_box.add_widget(cancel_button)
-                content.add_widget(confirm_label)
-                content.add_widget(button_box)
-
-                # Adjust size hint for potentially longer message
-                popup = Popup(
-                    title="Confirm Deletion", content=content, size_hint=(0.8, 0.5)
-                )
-
-                def delete_action(instance):
-                    self.delete_account(account_id) # Call the actual delete method
-                    popup.dismiss()
-
-                delete_button.bind(on_press=delete_action)
-                cancel_button.bind(on_press=popup.dismiss)
+                self._delete_target = account_id
+                self._delete_popup.ids.message_label.text = confirm_message
+                self._delete_popup.open()
 
-            if popup: # Check if popup was created
-                popup.open()
-            else: # Should not happen unless dependency check failed weirdly
-                raise Exception("Popup creation failed unexpectedly.")
-
-        except Exception as e:
-            print(f"Error opening Delete Confirmation popup: {e}")
+        except Exception:
+            Logger.exception("AccountManagement: Error opening Delete Confirmation popup")
             if self.status_label:
                 self.status_label.text = "Error opening delete dialog."
 
-    # check_account_dependencies (Add this method if it's missing or incomplete)
+    def _confirm_delete_popup(self, instance):
+        self.delete_account(self._delete_target)  # Call the actual delete method
+        self._delete_popup.dismiss()
+
     def check_account_dependencies(self, account_id):
         """
         Checks if an account has linked transactions (blocking).
-        Returns:
+        Counts come from the cache filled as account pages are loaded (and by
+        add_account), so this never touches the DB.
+        Returns a (blocking_text, snapshot_count) tuple where blocking_text is:
             - Warning text if transactions exist (blocking deletion).
             - None if no transactions exist (deletion allowed, snapshots will be cascaded).
-            - Error string if a database error occurs during check.
+            - Error string if the account's counts aren't loaded.
         """
-        try:
-            with SessionLocal() as db:
-                # Only check for transactions as they are the only blocking dependency now
-                transaction_count = (
-                    db.query(Transaction)
-                    .filter(Transaction.account_id == account_id)
-                    .count()
-                )
+        counts = self._dep_cache.get(account_id)
+        if counts is None:
+            Logger.error(
+                "AccountManagement: No dependency counts loaded for account %s",
+                account_id,
+            )
+            # Return an error string, which will implicitly block deletion in the calling function
+            return "Error checking dependencies: account not loaded.", 0
 
-                if transaction_count > 0:
-                    # Return the specific blocking warning
-                    return f"{transaction_count} linked transaction(s)"
+        transaction_count, snapshot_count = counts
+        if transaction_count > 0:
+            # Return the specific blocking warning
+            return f"{transaction_count} linked transaction(s)", snapshot_count
 
-                # If no transactions, return None to indicate deletion is allowed
-                # The confirmation dialog will handle checking/warning about snapshots.
-                return None
-        except Exception as e:
-            print(f"Error checking dependencies for account {account_id}: {e}")
-            # Return an error string, which will implicitly block deletion in the calling function
-            return f"Error checking dependencies: {e}"
+        # If no transactions, deletion is allowed.
+        # The confirmation dialog uses snapshot_count to warn about the cascade.
+        return None, snapshot_count
 
     def delete_account(self, account_id):
+        """Deletes an account and its snapshot entries (the write runs on a worker thread)."""
         # Dependency check should be done *before* calling this method (in confirm_delete_account)
 
-        print(f"Attempting to delete account ID {account_id}")
-        try:
-            with SessionLocal() as db:
-                # Optional safety re-check (can be removed if confirm_delete_account is reliable)
-                # if self.check_account_dependencies(account_id):
-                #    print(f"Deletion aborted for account ID {account_id} due to dependencies found unexpectedly.")
-                #    if self.status_label: self.status_label.text = "Deletion cancelled: Account has linked data."
-                #    return
-
-                account_to_delete = (
-                    db.query(Account).filter(Account.id == account_id).first()
+        Logger.debug("AccountManagement: Deleting account ID %s", account_id)
+
+        def work(db):
+            # Bulk DELETEs skip the ORM cascade, so remove the account's
+            # snapshot entries explicitly in the same transaction
+            db.execute(
+                delete(SnapshotEntry).where(SnapshotEntry.account_id == account_id)
+            )
+            # RETURNING gives the name for the status message without a prior SELECT
+            account_name = db.execute(
+                delete(Account).where(Account.id == account_id).returning(Account.name)
+            ).scalar_one_or_none()
+            if account_name is None:
+                db.rollback()
+                return None
+            db.commit()
+            return account_name
+
+        def done(account_name, error):
+            if error is not None:
+                error_msg = f"Error deleting account ID {account_id}: {error}"
+                if self.status_label:
+                    self.status_label.text = error_msg
+                Logger.error("AccountManagement: %s", error_msg)
+                return
+            if account_name is None:
+                if self.status_label:
+                    self.status_label.text = f"Error: Account ID {account_id} not found."
+                Logger.warning(
+                    "AccountManagement: Account ID %s not found for deletion",
+                    account_id,
                 )
-                if account_to_delete:
-                    account_name = account_to_delete.name  # Get name before deleting
-                    db.delete(account_to_delete)
-                    db.commit()
-                    print(f"Account '{account_name}' (ID: {account_id}) deleted.")
-                    if self.status_label:
-                        self.status_label.text = f"Account '{account_name}' deleted."
-                    self.load_accounts_for_rv()  # Refresh list
-                    self.deselect_account()  # Clear selection
-                else:
-                    if self.status_label:
-                        self.status_label.text = (
-                            f"Error: Account ID {account_id} not found."
-                        )
-                    print(f"Account ID {account_id} not found for deletion.")
-
-        except Exception as e:
-            # db.rollback() # Handled by SessionLocal context manager
-            error_msg = f"Error deleting account ID {account_id}: {e}"
+                return
+
+            Logger.info(
+                "AccountManagement: Account %r (ID: %s) deleted",
+                account_name,
+                account_id,
+            )
             if self.status_label:
-                self.status_label.text = error_msg
-            print(error_msg)
+                self.status_label.text = f"Account '{account_name}' deleted."
+            # Drop just the deleted row instead of reloading the list
+            idx = self._find_account_index(account_id)
+            if idx is not None:
+                self._remove_row(idx)
+            self._dep_cache.pop(account_id, None)
+            self.deselect_account()  # Clear selection
+
+        self._run_in_background(work, done)
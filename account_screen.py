@@ -1,38 +1,149 @@
+import re
 from datetime import date, datetime # Import date and datetime
+from kivy.app import App  # Needed for App.get_running_app() in AccountRow
 from kivy.uix.screenmanager import Screen
-from kivy.properties import ObjectProperty
-from kivy.uix.label import Label
-from kivy.factory import Factory
-from kivy.metrics import dp
+from kivy.uix.boxlayout import BoxLayout
+from kivy.uix.behaviors import FocusBehavior
+from kivy.uix.recycleview.views import RecycleDataViewBehavior
+from kivy.properties import ObjectProperty, NumericProperty, StringProperty
 from kivy.clock import Clock
-from sqlalchemy.orm import joinedload # For efficient querying
-
-from database import SessionLocal, Account, Snapshot, SnapshotEntry
+from kivy.factory import Factory  # NumericInput is a dynamic class in budget.kv
+from sqlalchemy import select, insert, func
+
+from database import (
+    SessionLocal,
+    Account,
+    Snapshot,
+    SnapshotEntry,
+    count_queries,
+    DEBUG_QUERY_COUNTS,
+    DB_EXECUTOR,
+    dollars_to_cents,
+)
+
+# Shared strings for the most common "Last Balance" cells (no balance yet / zero),
+# so those rows reuse one string object instead of formatting a new one each load
+_NA = "N/A"
+_ZERO = "0.00"
+
+# NumericInput's 'float' input_filter only lets through text matching
+# -?[0-9]*.?[0-9]*, so the leftovers that float() rejects are "-", "." and "-.".
+# This matches exactly the parseable texts; dollars_to_cents() can still reject
+# one whose cents don't fit in 64 bits.
+_BALANCE_RE = re.compile(r"-?(\d+\.?\d*|\.\d+)")
+
+
+def _format_balance(balance):
+    """Text for a "Last Balance" cell."""
+    if balance is None:
+        return _NA
+    if balance == 0.0:
+        return _ZERO
+    return format(balance, ".2f")
+
+
+class AccountRow(RecycleDataViewBehavior, BoxLayout):
+    """One row of the snapshot list (viewclass of the RecycleView; layout in budget.kv).
+    All three cells are Labels; tapping the current-balance cell opens the
+    screen's single shared balance editor over it."""
+    acc_id = NumericProperty(0)
+    name = StringProperty("")
+    last = StringProperty("")  # Last snapshot balance, already formatted
+    current = StringProperty("")  # Balance entered for the new snapshot
+    index = None
+
+    def refresh_view_attrs(self, rv, index, data):
+        """Called by the RecycleView when this widget is (re)bound to a data row."""
+        self.index = index
+        return super().refresh_view_attrs(rv, index, data)
+
+    def on_touch_down(self, touch):
+        cell = self.ids.current_label
+        if self.index is not None and cell.collide_point(*touch.pos):
+            # Keep FocusBehavior from unfocusing the editor we're about to focus
+            FocusBehavior.ignored_touch.append(touch)
+            App.get_running_app().root.get_screen("accounts").start_editing(
+                self.index, cell
+            )
+            return True
+        return super().on_touch_down(touch)
 
 
 class AccountsScreen(Screen):
     snapshot_status_label = ObjectProperty(None)
-    account_list_layout = ObjectProperty(None)  # Reference to the GridLayout
+    account_recycle_view = ObjectProperty(None)  # RecycleView of AccountRow widgets
+    snapshot_date_label = ObjectProperty(None)
+    new_snapshot_date_label = ObjectProperty(None)
 
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
-        # Dictionary to store references: {account_id: balance_input_widget}
-        self.account_inputs = {}
-        # --- NEW: Dictionary to store references to last balance labels ---
-        # {account_id: last_balance_label_widget}
-        self.last_balance_labels = {}
+        # One reusable ClockEvent for the setup kick instead of a new one per entry
+        self._setup_trigger = Clock.create_trigger(self._setup_ui, 0)
+        # Single NumericInput shared by all rows, created on first use
+        self._editor = None
+        self._editing_index = None  # Row the editor is currently over
 
     def on_enter(self, *args):
         """Called when the screen is displayed. Schedule the UI setup."""
         # Schedule the actual setup for the next frame to ensure widgets are ready
-        Clock.schedule_once(self._setup_ui, 0)  # 0 schedules for the very next frame
+        self._setup_trigger()  # Fires on the very next frame
+
+    def on_leave(self, *args):
+        self.finish_editing()
+
+    def on_account_recycle_view(self, instance, rv):
+        # The editor floats over a row, so commit and hide it once the list scrolls
+        if rv is not None:
+            rv.bind(scroll_y=self.finish_editing)
+
+    def start_editing(self, index, cell):
+        """Shows the shared balance editor over `cell`, the current-balance
+        Label of row `index`."""
+        self.finish_editing()  # Commit any edit in progress first
+        if self._editor is None:
+            self._editor = Factory.NumericInput(
+                hint_text="0.00", halign="right", size_hint=(None, None)
+            )
+            self._editor.bind(focus=self._on_editor_focus)
+
+        editor = self._editor
+        self._editing_index = index
+        editor.text = self.account_recycle_view.data[index]["current"]
+        editor.size = cell.size
+        # The screen is a RelativeLayout, so convert the cell's window position
+        editor.pos = self.to_widget(*cell.to_window(*cell.pos), relative=True)
+        if editor.parent is None:
+            self.add_widget(editor)
+        editor.focus = True
+
+    def _on_editor_focus(self, editor, focused):
+        if not focused:
+            self.finish_editing()
+
+    def finish_editing(self, *args):
+        """Writes the editor's text back into the edited row and hides the editor."""
+        index = self._editing_index
+        if index is None:
+            return
+        self._editing_index = None  # Clear first: unfocusing below re-enters here
+
+        editor = self._editor
+        rv = self.account_recycle_view
+        if index < len(rv.data):
+            text = editor.text.strip()
+            rv.data[index]["current"] = text
+            view = rv.view_adapter.get_visible_view(index)
+            if view is not None:
+                view.current = text
+        editor.focus = False
+        self.remove_widget(editor)
 
     def _setup_ui(self, dt):  # dt is the time delta passed by Clock
         """This method runs after on_enter, when widgets should be bound."""
         print("Entering Accounts Screen (_setup_ui). Loading accounts...")
 
         # Defensive check (optional but good practice)
-        if not self.snapshot_status_label or not self.account_list_layout:
+        if not self.snapshot_status_label or not self.account_recycle_view:
             print("Error: UI elements not ready even after scheduling. Aborting setup.")
             # You could try rescheduling again: Clock.schedule_once(self._setup_ui, 0.1)
             return
@@ -43,202 +154,216 @@ class AccountsScreen(Screen):
         self.load_accounts_ui()  # Now load the accounts
 
     def load_accounts_ui(self):
-        """Queries DB for accounts, finds the latest snapshot balance for each,
-           and populates the GridLayout, storing label references."""
-        if not self.account_list_layout:
-            print("Error: Account list layout not ready.")
+        """Queries DB for accounts and the latest snapshot balance for each on
+           the DB worker thread, then fills the RecycleView data (only visible
+           rows get widgets) back on the UI thread."""
+        if not self.account_recycle_view:
+            print("Error: Account list RecycleView not ready.")
             # ... (error handling) ...
             return
 
-        # --- Clear label references BEFORE clearing widgets ---
-        self.account_inputs.clear()
-        self.last_balance_labels.clear() # Clear the label refs too
-        self.account_list_layout.clear_widgets()
-
-        # Define column proportions, matching KV headers
-        col_hint_name = 0.40
-        col_hint_last_bal = 0.25
-        col_hint_curr_bal = 0.35
+        self.finish_editing()  # The rows are about to be replaced
+        DB_EXECUTOR.submit(self._query_accounts).add_done_callback(
+            lambda future: Clock.schedule_once(lambda dt: self._populate_ui(future), 0)
+        )
 
-        latest_balances = {}
+    def _query_accounts(self):
+        """Runs on the DB worker thread (so it opens its own session).
+        Returns (latest_snapshot_date_str, rows) where rows is the RecycleView data."""
         latest_snapshot_date_str = "N/A"
-        today_date_str = date.today().strftime("%Y-%m-%d")
-
-        try:
-            with SessionLocal() as db:
-                # Get the date of the most recent snapshot with entries
-                latest_snapshot_with_entries = db.query(Snapshot).\
-                    join(SnapshotEntry, Snapshot.id == SnapshotEntry.snapshot_id).\
-                    order_by(Snapshot.timestamp.desc()).first()
-
-                if latest_snapshot_with_entries:
-                    latest_snapshot_date_str = latest_snapshot_with_entries.timestamp.strftime("%Y-%m-%d")
-
-                # --- Add a single row for Dates ---
-                # Column 1: "Date:" label
-                date_title_label = Label(
-                    text="Date:",
-                    size_hint_y=None, height=dp(30), halign="left", valign="middle",
-                    size_hint_x=col_hint_name, color=(0.9, 0.9, 0.9, 1) # Brighter text
-                )
-                date_title_label.bind(width=lambda instance, width: setattr(instance, 'text_size', (width, None)))
-                self.account_list_layout.add_widget(date_title_label)
-
-                # Column 2: Snapshot Date
-                snapshot_date_val_label = Label(
-                    text=f"Snapshot: {latest_snapshot_date_str}",
-                    size_hint_y=None, height=dp(30), halign="right", valign="middle",
-                    size_hint_x=col_hint_last_bal, color=(0.9, 0.9, 0.9, 1) # Brighter text
-                )
-                snapshot_date_val_label.bind(width=lambda instance, width: setattr(instance, 'text_size', (width, None)))
-                self.account_list_layout.add_widget(snapshot_date_val_label)
-
-                # Column 3: New Snapshot Date (Today)
-                new_snapshot_date_val_label = Label(
-                    text=f"New: {today_date_str}",
-                    size_hint_y=None, height=dp(30), halign="right", valign="middle",
-                    size_hint_x=col_hint_curr_bal, color=(0.9, 0.9, 0.9, 1) # Brighter text
-                )
-                new_snapshot_date_val_label.bind(width=lambda instance, width: setattr(instance, 'text_size', (width, None)))
-                self.account_list_layout.add_widget(new_snapshot_date_val_label)
-                
-                # Optional: Add a small separator row (e.g., an empty label with minimal height or a specific widget)
-                # self.account_list_layout.add_widget(Label(text="", size_hint_y=None, height=dp(5), size_hint_x=1)) # Spans all 3 cols implicitly due to GridLayout
-                # self.account_list_layout.add_widget(Label(text="", size_hint_y=None, height=dp(5), size_hint_x=1))
-                # self.account_list_layout.add_widget(Label(text="", size_hint_y=None, height=dp(5), size_hint_x=1))
-
-
-                # Query accounts (original logic)
-                accounts = db.query(Account).order_by(Account.name).all()
-                if not accounts:
-                    self.snapshot_status_label.text = "No accounts found. Add accounts in 'Manage Accounts'."
-                    return
-
-                account_ids = [acc.id for acc in accounts]
-                # ... (Query and process all_entries to populate latest_balances) ...
-                all_entries = (
-                     db.query(SnapshotEntry)
-                     .options(joinedload(SnapshotEntry.snapshot))
-                     .filter(SnapshotEntry.account_id.in_(account_ids))
-                     .join(SnapshotEntry.snapshot)
-                     .order_by(SnapshotEntry.account_id, Snapshot.timestamp.desc())
-                     .all()
-                 )
-                processed_accounts = set()
-                for entry in all_entries:
-                    if entry.account_id not in processed_accounts:
-                        latest_balances[entry.account_id] = entry.balance
-                        processed_accounts.add(entry.account_id)
-
-
-                # 3. Populate the UI
-                for account in accounts:
-                    last_balance = latest_balances.get(account.id)
-                    last_balance_str = f"{last_balance:.2f}" if last_balance is not None else "N/A"
-
-                    # --- Column 1: Account Name ---
-                    name_label = Label(
-                        text=account.name, size_hint_y=None, height=dp(40),
-                        halign="left", valign="middle", size_hint_x=col_hint_name
-                    )
-                    name_label.bind(width=lambda instance, width: setattr(instance, 'text_size', (width, None)))
-                    self.account_list_layout.add_widget(name_label)
-
-                    # --- Column 2: Last Snapshot Balance ---
-                    last_balance_label = Label(
-                        text=last_balance_str, size_hint_y=None, height=dp(40),
-                        halign="right", valign="middle", color=(0.8, 0.8, 0.8, 1),
-                        size_hint_x=col_hint_last_bal
-                    )
-                    last_balance_label.bind(width=lambda instance, width: setattr(instance, 'text_size', (width, None)))
-                    self.account_list_layout.add_widget(last_balance_label)
-                    self.last_balance_labels[account.id] = last_balance_label
-
 
-                    # --- Column 3: Current Balance Input ---
-                    balance_input = Factory.NumericInput(
-                        hint_text="0.00", size_hint_y=None, height=dp(40),
-                        halign="right", size_hint_x=col_hint_curr_bal
+        with count_queries(enabled=DEBUG_QUERY_COUNTS) as queries, SessionLocal() as db:
+            # Get the date of the most recent snapshot with entries
+            # (only the timestamp column is needed, not a Snapshot object)
+            latest_snapshot_timestamp = db.execute(
+                select(Snapshot.timestamp)
+                .join(SnapshotEntry, Snapshot.id == SnapshotEntry.snapshot_id)
+                .order_by(Snapshot.timestamp.desc())
+                .limit(1)
+            ).scalar()
+
+            if latest_snapshot_timestamp:
+                latest_snapshot_date_str = latest_snapshot_timestamp.date().isoformat()
+
+            # Latest balance per account: number each account's entries newest
+            # first and keep row 1. Ties on the timestamp go to the newest
+            # entry id, so every account gets exactly one row
+            ranked_entries = (
+                select(
+                    SnapshotEntry.account_id,
+                    SnapshotEntry.balance_dollars.label("balance"),
+                    func.row_number()
+                    .over(
+                        partition_by=SnapshotEntry.account_id,
+                        order_by=(Snapshot.timestamp.desc(), SnapshotEntry.id.desc()),
                     )
-                    self.account_list_layout.add_widget(balance_input)
-                    self.account_inputs[account.id] = balance_input
-
+                    .label("rn"),
+                )
+                .join(Snapshot, SnapshotEntry.snapshot_id == Snapshot.id)
+                .subquery()
+            )
+            latest_entries = (
+                select(ranked_entries.c.account_id, ranked_entries.c.balance)
+                .where(ranked_entries.c.rn == 1)
+                .subquery()
+            )
+
+            # Accounts (just the columns the rows display) LEFT JOINed to their
+            # latest balance, so one ordered query feeds the whole list
+            accounts = db.execute(
+                select(Account.id, Account.name, latest_entries.c.balance)
+                .outerjoin(latest_entries, Account.id == latest_entries.c.account_id)
+                .order_by(Account.name)
+            ).all()
+
+        if DEBUG_QUERY_COUNTS:
+            # Latest snapshot date + accounts with balances; more means a per-row lazy load crept in
+            if len(queries) > 2:
+                print(f"Warning: load_accounts_ui ran {len(queries)} queries (expected 2): {queries}")
+
+        rows = []
+        for account_id, account_name, last_balance in accounts:
+            rows.append({
+                "acc_id": account_id,
+                "name": account_name,
+                "last": _format_balance(last_balance),
+                "current": "",  # Filled in as the user types
+            })
+        return latest_snapshot_date_str, rows
+
+    def _populate_ui(self, future):
+        """UI-thread half of load_accounts_ui: applies the worker's result."""
+        try:
+            latest_snapshot_date_str, rows = future.result()
         except Exception as e:
             # ... (error handling) ...
             self.snapshot_status_label.text = f"Error loading accounts: {e}"
             print(f"Database error loading accounts: {e}")
-            self.account_list_layout.clear_widgets()
-            self.account_list_layout.add_widget(Label(text="Error loading. Check logs."))
+            self.account_recycle_view.data = []
+            return
+
+        # --- Dates row above the list ---
+        self.snapshot_date_label.text = f"Snapshot: {latest_snapshot_date_str}"
+        self.new_snapshot_date_label.text = f"New: {date.today().isoformat()}"  # YYYY-MM-DD, C fast path
+
+        self.finish_editing()  # In case a cell was tapped while the query ran
+        # Populate the UI in a single assignment
+        self.account_recycle_view.data = rows
+        if not rows:
+            self.snapshot_status_label.text = "No accounts found. Add accounts in 'Manage Accounts'."
 
     # --- MODIFIED: create_new_snapshot ---
     def create_new_snapshot(self):
-        if not self.account_inputs:
+        self.finish_editing()  # Include a balance that is still being typed
+        rows = self.account_recycle_view.data if self.account_recycle_view else []
+        if not rows:
             self.snapshot_status_label.text = "No accounts loaded or inputs available."
             return
 
         print("Create Snapshot button pressed - Reading balances from inputs")
 
-        current_balances = {} # Holds {acc_id: balance_float} from inputs
+        current_balances = {} # Holds {acc_id: balance in cents} from inputs
         errors = []
-        for acc_id, input_widget in self.account_inputs.items():
-            balance_str = input_widget.text.strip()
-            try:
-                balance = float(balance_str) if balance_str else 0.0
-                current_balances[acc_id] = balance
-            except ValueError:
+        for row in rows:
+            acc_id = row["acc_id"]
+            balance_str = row["current"]
+            if _BALANCE_RE.fullmatch(balance_str):
+                try:
+                    current_balances[acc_id] = dollars_to_cents(balance_str)
+                    continue
+                except ValueError:
+                    pass  # Too large to store in cents; reported below
+            if balance_str:  # Left empty means 0.0 without a warning
                 errors.append(
                     f"Invalid balance for account ID {acc_id}: '{balance_str}'. Using 0.0."
                 )
-                current_balances[acc_id] = 0.0
+            current_balances[acc_id] = 0
 
         if errors:
             print("Input errors found:\n" + "\n".join(errors))
             # Optionally update status label more prominently here
 
-        # Proceed with creating the snapshot
-        try:
-            with SessionLocal() as db:
-                account_ids = list(current_balances.keys())
-                if not account_ids:
-                    self.snapshot_status_label.text = "No account balances entered."
-                    return
-
-                # Optional: Verify accounts still exist
-                accounts_in_db = db.query(Account.id).filter(Account.id.in_(account_ids)).count()
-                if accounts_in_db != len(account_ids):
-                    self.snapshot_status_label.text = "Error: Account mismatch. Reloading UI."
-                    print("Account mismatch detected, reloading UI.")
-                    self.load_accounts_ui() # Reload might fix inconsistencies
-                    return
-
-                # Create the Snapshot record
-                new_snapshot = Snapshot(timestamp=datetime.now(), notes="Manual Snapshot via UI")
-                db.add(new_snapshot)
-                db.flush() # Get the new_snapshot.id
-
-                # Create SnapshotEntry records
-                for acc_id, bal in current_balances.items():
-                    entry = SnapshotEntry(
-                        snapshot_id=new_snapshot.id, account_id=acc_id, balance=bal
-                    )
-                    db.add(entry)
-
-                db.commit() # Commit snapshot and entries
-                timestamp_str = new_snapshot.timestamp.strftime("%Y-%m-%d %H:%M:%S")
-                status_msg = f"Snapshot created at {timestamp_str} with {len(current_balances)} entries."
-                if errors:
-                    status_msg += "\nNote: Some invalid balances were set to 0.0."
-
-                self.snapshot_status_label.text = status_msg
-                print(f"Snapshot ID: {new_snapshot.id} created.")
-
-                # Reload the UI to show the new snapshot date and balances
-                self.load_accounts_ui()
-                # Clear inputs after successful snapshot
-                for input_widget in self.account_inputs.values():
-                    input_widget.text = ""
+        if not current_balances:
+            self.snapshot_status_label.text = "No account balances entered."
+            return
 
+        # Proceed with creating the snapshot on the DB worker thread
+        self.snapshot_status_label.text = "Saving snapshot..."
+        DB_EXECUTOR.submit(self._save_snapshot, current_balances).add_done_callback(
+            lambda future: Clock.schedule_once(
+                lambda dt: self._on_snapshot_saved(future, current_balances, errors), 0
+            )
+        )
 
+    def _save_snapshot(self, current_balances):
+        """Runs on the DB worker thread. Returns (snapshot_id, timestamp), or
+        (None, missing_account_ids) if some accounts no longer exist."""
+        with SessionLocal() as db:
+            account_ids = list(current_balances.keys())
+
+            # Optional: Verify accounts still exist (and find out which don't)
+            existing_ids = set(
+                db.execute(select(Account.id).where(Account.id.in_(account_ids))).scalars()
+            )
+            missing_ids = set(account_ids) - existing_ids
+            if missing_ids:
+                return None, missing_ids
+
+            # Create the Snapshot record; RETURNING hands back its id from the INSERT
+            snapshot_timestamp = datetime.now()
+            snapshot_id = db.execute(
+                insert(Snapshot)
+                .values(timestamp=snapshot_timestamp, notes="Manual Snapshot via UI")
+                .returning(Snapshot.id)
+            ).scalar_one()
+
+            # Create SnapshotEntry records with one batched INSERT
+            # (same transaction, so they commit atomically with the Snapshot)
+            db.execute(
+                insert(SnapshotEntry),
+                [
+                    {
+                        "snapshot_id": snapshot_id,
+                        "account_id": acc_id,
+                        "balance": bal,
+                    }
+                    for acc_id, bal in current_balances.items()
+                ],
+            )
+
+            db.commit() # Commit snapshot and entries
+            return snapshot_id, snapshot_timestamp
+
+    def _on_snapshot_saved(self, future, current_balances, errors):
+        """UI-thread half of create_new_snapshot."""
+        try:
+            snapshot_id, detail = future.result()
         except Exception as e:
             self.snapshot_status_label.text = f"Error saving snapshot: {e}"
             print(f"Database error during snapshot save: {e}")
+            return
+
+        if snapshot_id is None:
+            self.snapshot_status_label.text = "Error: Account mismatch. Reloading UI."
+            print(f"Account mismatch detected (missing IDs: {sorted(detail)}), reloading UI.")
+            self.load_accounts_ui() # Reload might fix inconsistencies
+            return
+
+        timestamp_str = detail.isoformat(sep=" ", timespec="seconds")
+        status_msg = f"Snapshot created at {timestamp_str} with {len(current_balances)} entries."
+        if errors:
+            status_msg += "\nNote: Some invalid balances were set to 0.0."
+
+        self.snapshot_status_label.text = status_msg
+        print(f"Snapshot ID: {snapshot_id} created.")
+
+        # The new balances are already known, so update the rows in place
+        # instead of re-running the load queries
+        self.finish_editing()
+        for row in self.account_recycle_view.data:
+            balance = current_balances.get(row["acc_id"])
+            if balance is not None:
+                row["last"] = _format_balance(balance / 100)
+            row["current"] = ""  # Clear inputs after successful snapshot
+        self.account_recycle_view.refresh_from_data()
+        self.snapshot_date_label.text = f"Snapshot: {detail.date().isoformat()}"
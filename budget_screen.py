@@ -1,6 +1,8 @@
 import os
 import csv
+import operator
 import datetime
+from contextlib import contextmanager
 from kivy.uix.screenmanager import Screen
 from kivy.properties import ObjectProperty
 from kivy.uix.boxlayout import BoxLayout
@@ -9,25 +11,168 @@ from kivy.uix.filechooser import FileChooserListView
 from kivy.uix.popup import Popup
 from kivy.metrics import dp
 from kivy.clock import Clock
+from kivy.logger import Logger
+
+from sqlalchemy import select, insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from database import (
+    SessionLocal,
+    Account,
+    Transaction,
+    Category,
+    commit_generation,
+    DB_EXECUTOR,
+    DB_READY,
+    optimize_db,
+    dollars_to_cents,
+)
+
+# Number of parsed CSV rows sent to the DB per INSERT executemany
+IMPORT_BATCH_SIZE = 1000
+# Skipped rows listed individually in the import log; the rest are only counted
+IMPORT_ERROR_LOG_LIMIT = 20
+
+# Column indices (date, description, category, amount) for bank export headers
+# we have seen; any other header falls back to looking the columns up by name
+KNOWN_CSV_HEADERS = {
+    (
+        "Transaction Date",
+        "Post Date",
+        "Description",
+        "Category",
+        "Type",
+        "Amount",
+        "Memo",
+    ): (0, 2, 3, 5),
+}
+
+# Characters dropped from the CSV amount column ("$1,234.50 " -> "1234.50")
+_AMOUNT_TABLE = str.maketrans("", "", "$, \t\r\n\u00a0")
+
+# Format of the CSV date column; see _parse_mdy
+CSV_DATE_FORMAT = "%m/%d/%Y"
+
+
+def _parse_mdy(date_str):
+    """Parses an MM/DD/YYYY date. Slices the zero-padded form directly (the
+    common case) and only falls back to strptime for anything else."""
+    if (
+        len(date_str) == 10
+        and date_str[2] == "/"
+        and date_str[5] == "/"
+        and date_str[:2].isdigit()
+        and date_str[3:5].isdigit()
+        and date_str[6:].isdigit()
+    ):
+        try:
+            return datetime.date(
+                int(date_str[6:10]), int(date_str[0:2]), int(date_str[3:5])
+            )
+        except ValueError:
+            pass
+    return datetime.datetime.strptime(date_str, CSV_DATE_FORMAT).date()
+
+
+# Fixed-width layout of the transaction list label
+_TRANSACTION_LIST_HEADER = (
+    "Recent Transactions:\n"
+    + "{:<11} | {:<30} | {:>9} | {:<15} | {:<15}\n".format(
+        "Date", "Description", "Amount", "Category", "Account"
+    )
+    + "-" * 80
+    + "\n"
+)
+_format_transaction_row = "{:<11} | {:<30} | {:>9.2f} | {:<15} | {:<15}\n".format
+
+
+def _trunc(text, width):
+    """Fits text into a column of the given width, marking cut text with '..'."""
+    return text if len(text) <= width else text[: width - 2] + ".."
+
+
+def _write_import_batch(
+    db, pending_rows, new_category_rows, category_cache, created_names
+):
+    """Inserts one batch of imported transactions. Categories first seen in this
+    batch are created with a single INSERT ... ON CONFLICT DO NOTHING and their
+    ids filled into the waiting rows (and category_cache) before the insert;
+    their names are added to created_names."""
+    if new_category_rows:
+        new_names = {name for _, name in new_category_rows} - category_cache.keys()
+        if new_names:
+            created_names.extend(sorted(new_names))
+            db.execute(
+                sqlite_insert(Category).on_conflict_do_nothing(
+                    index_elements=[Category.name]
+                ),
+                [{"name": name} for name in new_names],
+            )
+            category_cache.update(
+                (name, cat_id)
+                for cat_id, name in db.execute(
+                    select(Category.id, Category.name).where(
+                        Category.name.in_(new_names)
+                    )
+                )
+            )
+        for row, name in new_category_rows:
+            row["category_id"] = category_cache[name]
+        new_category_rows.clear()
 
-from database import SessionLocal, Account, Transaction, Category
+    db.execute(insert(Transaction), pending_rows)
+    pending_rows.clear()
 
 
 class BudgetScreen(Screen):
     transaction_list_label = ObjectProperty(None)
     filechooser_popup = ObjectProperty(None)
 
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        # Reusable next-frame trigger for _setup_ui (avoids a new ClockEvent per entry)
+        self._setup_trigger = Clock.create_trigger(self._setup_ui, 0)
+        # Last rendered transaction list and the commit generation it was read at
+        self._cached_display_text = None
+        self._cached_display_generation = None
+        # UI-thread session kept while the screen is shown (see _read_session)
+        self._session = None
+
     def on_enter(self, *args):
         """Called when the screen is displayed."""
         print("Entering Budget Screen. Loading transactions...")
         # Schedule UI update similar to AccountsScreen to ensure label is ready
-        Clock.schedule_once(self._setup_ui, 0)
+        self._setup_trigger()
+
+    def on_leave(self, *args):
+        if self._session is not None:
+            self._session.close()
+            self._session = None
+
+    @contextmanager
+    def _read_session(self):
+        """Yields the screen's long-lived session for reads on the UI thread.
+
+        The transaction is ended afterwards so the next read sees new commits
+        (and WAL checkpoints aren't held back). The CSV import runs on the DB
+        worker thread and keeps opening its own session, since sessions must
+        not be shared across threads."""
+        if self._session is None:
+            self._session = SessionLocal()
+        try:
+            yield self._session
+        finally:
+            self._session.rollback()
 
     def _setup_ui(self, dt):
         """Runs after on_enter, ensures widgets are ready."""
         if not self.transaction_list_label:
             print("Error: BudgetScreen UI elements not ready. Aborting setup.")
             return
+        if not DB_READY.is_set():
+            # init_db() is still running on the DB worker; retry next frame
+            self._setup_trigger()
+            return
         self.update_transaction_display()  # Initial load attempt
 
     def show_import_dialog(self):
@@ -62,6 +207,21 @@ class BudgetScreen(Screen):
         file_path = os.path.join(path, selection[0])
         print(f"Attempting to import CSV: {file_path}")
 
+        # Close the dialog right away; parsing and inserting run on the DB worker
+        # thread and the result is shown via _finish_import on the UI thread
+        self.filechooser_popup.dismiss()
+        self.transaction_list_label.text = (
+            f"Importing '{os.path.basename(file_path)}'..."
+        )
+        DB_EXECUTOR.submit(self._do_import, file_path).add_done_callback(
+            lambda future: Clock.schedule_once(
+                lambda dt: self._finish_import(*future.result()), 0
+            )
+        )
+
+    def _do_import(self, file_path):
+        """Parses the CSV and inserts its transactions. Runs on the DB worker
+        thread (so it opens its own session). Returns (committed, status message)."""
         imported_count = 0
         skipped_count = 0
         error_rows = []  # Store rows that caused errors
@@ -69,102 +229,104 @@ class BudgetScreen(Screen):
         try:
             with SessionLocal() as db:
                 # --- Get default account and 'Uncategorized' category ---
-                default_account = (
-                    db.query(Account).filter(Account.name == "Cash").first()
-                )
-                if not default_account:
+                # Only their ids are needed, so select those rather than
+                # loading ORM objects into the session
+                default_account_id = db.execute(
+                    select(Account.id).where(Account.name == "Cash")
+                ).scalar()
+                if default_account_id is None:
                     msg = "Error: Default 'Cash' account missing."
                     print(msg)
-                    self.transaction_list_label.text = msg
-                    self.filechooser_popup.dismiss()
-                    return
+                    return False, msg
 
-                uncategorized_cat = (
-                    db.query(Category).filter(Category.name == "Uncategorized").first()
-                )
-                if not uncategorized_cat:
+                uncategorized_id = db.execute(
+                    select(Category.id).where(Category.name == "Uncategorized")
+                ).scalar()
+                if uncategorized_id is None:
                     msg = "Error: 'Uncategorized' category missing."
                     print(msg)
-                    self.transaction_list_label.text = msg
-                    self.filechooser_popup.dismiss()
-                    return
-
-                # --- Cache for Categories found/created during this import ---
-                # Stores {'csv_category_name': category_db_object}
-                category_cache = {"Uncategorized": uncategorized_cat}  # Pre-populate
-
-                with open(file_path, mode="r", encoding="utf-8-sig") as infile:
+                    return False, msg
+
+                # --- Cache of all Categories, loaded once up front ---
+                # Stores {'category_name': category_id}; new ones are added as created
+                category_cache = {
+                    name: cat_id
+                    for cat_id, name in db.execute(select(Category.id, Category.name))
+                }
+                # Validated transaction rows waiting to be inserted
+                pending_rows = []
+                # (row, category name) for pending rows whose category is new
+                uncategorized_rows = []
+                # Names of categories this import created, for the summary log
+                new_categories = []
+
+                # newline="" lets csv handle line endings itself (the csv module's
+                # documented requirement) instead of translating them twice
+                with open(
+                    file_path, mode="r", encoding="utf-8-sig", newline=""
+                ) as infile:
                     reader = csv.reader(infile, delimiter=",")
                     try:
                         header = next(reader)  # Read header row
                     except StopIteration:
-                        self.transaction_list_label.text = "Error: CSV file is empty."
-                        self.filechooser_popup.dismiss()
-                        return
+                        return False, "Error: CSV file is empty."
                     print(f"CSV Header: {header}")
 
                     # --- Define column indices based on YOUR header ---
                     # Header: ['Transaction Date', 'Post Date', 'Description', 'Category', 'Type', 'Amount', 'Memo']
-                    try:
-                        # Use header.index() for robustness against column reordering
-                        date_col_idx = header.index("Transaction Date")  # Was 0
-                        desc_col_idx = header.index("Description")  # Was 2
-                        cat_col_idx = header.index("Category")  # Was 3
-                        amount_col_idx = header.index("Amount")  # Was 5
-                        # type_col_idx = header.index('Type') # If needed later (index 4)
-                    except ValueError as e:
-                        msg = f"Error: Missing expected column in CSV header: {e}"
-                        print(msg)
-                        self.transaction_list_label.text = msg
-                        self.filechooser_popup.dismiss()
-                        return
-
-                    # Minimum required columns check (optional but good)
-                    min_cols = (
-                        max(date_col_idx, desc_col_idx, cat_col_idx, amount_col_idx) + 1
+                    known_indices = KNOWN_CSV_HEADERS.get(tuple(header))
+                    if known_indices:
+                        date_col_idx, desc_col_idx, cat_col_idx, amount_col_idx = (
+                            known_indices
+                        )
+                    else:
+                        try:
+                            # Use header.index() for robustness against column reordering
+                            date_col_idx = header.index("Transaction Date")  # Was 0
+                            desc_col_idx = header.index("Description")  # Was 2
+                            cat_col_idx = header.index("Category")  # Was 3
+                            amount_col_idx = header.index("Amount")  # Was 5
+                            # type_col_idx = header.index('Type') # If needed later (index 4)
+                        except ValueError as e:
+                            msg = f"Error: Missing expected column in CSV header: {e}"
+                            print(msg)
+                            return False, msg
+
+                    # Pulls the four used columns out of a row in one call
+                    get_fields = operator.itemgetter(
+                        date_col_idx, desc_col_idx, cat_col_idx, amount_col_idx
                     )
 
                     for i, row in enumerate(reader, start=2):  # Start count from row 2
                         try:
-                            # Basic validation
-                            if len(row) < min_cols:
-                                print(f"Skipping row {i}, too few columns: {row}")
+                            # Extract and clean data; a short row fails the lookup
+                            # itself, so there is no separate length check per row
+                            try:
+                                date_str, description, category_name_csv, amount_raw = (
+                                    get_fields(row)
+                                )
+                            except IndexError:
                                 skipped_count += 1
                                 error_rows.append((i, row, "Too few columns"))
                                 continue
-
-                            # Extract and clean data
-                            date_str = row[date_col_idx].strip()
-                            description = row[desc_col_idx].strip()
-                            category_name_csv = row[cat_col_idx].strip()
-                            amount_str = (
-                                row[amount_col_idx]
-                                .strip()
-                                .replace("$", "")
-                                .replace(",", "")
-                            )  # Clean amount
+                            date_str = date_str.strip()
+                            description = description.strip()
+                            category_name_csv = category_name_csv.strip()
+                            amount_str = amount_raw.translate(_AMOUNT_TABLE)  # Clean amount
 
                             # --- Data Validation & Parsing ---
                             # Validate required fields are not empty
                             if not date_str or not description or not amount_str:
-                                print(
-                                    f"Skipping row {i}, missing required data (Date/Desc/Amount): {row}"
-                                )
                                 skipped_count += 1
                                 error_rows.append((i, row, "Missing required data"))
                                 continue
 
                             # Parse Date
-                            # *** ADJUST THE FORMAT ('%m/%d/%Y') IF YOUR CSV USES A DIFFERENT ONE ***
+                            # *** ADJUST CSV_DATE_FORMAT (and _parse_mdy) IF YOUR CSV USES A DIFFERENT ONE ***
                             # Examples: '%Y-%m-%d', '%m/%d/%y' (2-digit year), '%d-%b-%Y' (e.g., 26-Mar-2025)
                             try:
-                                trans_date = datetime.datetime.strptime(
-                                    date_str, "%m/%d/%Y"
-                                ).date()
+                                trans_date = _parse_mdy(date_str)
                             except ValueError:
-                                print(
-                                    f"Skipping row {i}, invalid date format: '{date_str}'. Expected MM/DD/YYYY. Row: {row}"
-                                )
                                 skipped_count += 1
                                 error_rows.append(
                                     (i, row, f"Invalid date format: {date_str}")
@@ -175,11 +337,8 @@ class BudgetScreen(Screen):
                             # *** ASSUMPTION: Amount column uses negative for expenses, positive for income ***
                             # If not, you might need to use the 'Type' column (index 4) to adjust the sign.
                             try:
-                                trans_amount = float(amount_str)
+                                trans_amount = dollars_to_cents(amount_str)
                             except ValueError:
-                                print(
-                                    f"Skipping row {i}, invalid amount format: '{amount_str}'. Row: {row}"
-                                )
                                 skipped_count += 1
                                 error_rows.append(
                                     (i, row, f"Invalid amount format: {amount_str}")
@@ -187,97 +346,128 @@ class BudgetScreen(Screen):
                                 continue
 
                             # --- Get or Create Category ---
-                            target_category = None
                             if not category_name_csv:  # Handle empty category field
-                                target_category = uncategorized_cat
-                            elif (
-                                category_name_csv in category_cache
-                            ):  # Check cache first
-                                target_category = category_cache[category_name_csv]
+                                target_category_id = uncategorized_id
                             else:
-                                # Try finding category in DB
-                                category_obj = (
-                                    db.query(Category)
-                                    .filter(Category.name == category_name_csv)
-                                    .first()
-                                )
-                                if category_obj:
-                                    target_category = category_obj
-                                else:
-                                    # Create new category if not found
-                                    print(
-                                        f"Creating new category: '{category_name_csv}' from row {i}"
-                                    )
-                                    new_cat = Category(name=category_name_csv)
-                                    db.add(new_cat)
-                                    # Flush to get the ID without full commit, allows rollback on later error
-                                    db.flush()
-                                    target_category = new_cat
-                                # Add to cache whether found or created
-                                category_cache[category_name_csv] = target_category
-
-                            # Defensive check (should always have a category by now)
-                            if not target_category:
-                                print(
-                                    f"Error: Failed to assign category for row {i}. Using Uncategorized. Row: {row}"
-                                )
-                                target_category = uncategorized_cat
-
-                            # --- Create Transaction object ---
-                            new_trans = Transaction(
-                                date=trans_date,
-                                description=description,
-                                amount=trans_amount,
-                                account_id=default_account.id,  # Still using default account
-                                category_id=target_category.id,  # Use found/created category ID
-                                # notes=row[memo_col_idx].strip() if len(row) > memo_col_idx else None # Optional: Add Memo
-                            )
-                            db.add(new_trans)
+                                # None for names not in the DB yet; those categories are
+                                # created in bulk when the batch is written
+                                target_category_id = category_cache.get(category_name_csv)
+
+                            # --- Queue the Transaction row for the next batch insert ---
+                            trans_row = {
+                                "date": trans_date,
+                                "description": description,
+                                "amount": trans_amount,
+                                "account_id": default_account_id,  # Still using default account
+                                "category_id": target_category_id,  # Use found/created category ID
+                                # "notes": row[memo_col_idx].strip() if len(row) > memo_col_idx else None # Optional: Add Memo
+                            }
+                            pending_rows.append(trans_row)
+                            if target_category_id is None:
+                                uncategorized_rows.append((trans_row, category_name_csv))
                             imported_count += 1
 
                         except Exception as e_row:
                             # Catch unexpected errors during row processing
-                            print(
-                                f"Skipping row {i} due to unexpected error: {e_row}. Row: {row}"
-                            )
                             skipped_count += 1
                             error_rows.append((i, row, f"Unexpected error: {e_row}"))
                             # Optional: Rollback the specific row's changes if needed,
                             # but SessionLocal handles rollback on context exit if commit fails.
 
+                        if len(pending_rows) >= IMPORT_BATCH_SIZE:
+                            # One executemany per batch instead of an ORM object per row;
+                            # only the current batch is ever held in memory
+                            _write_import_batch(
+                                db,
+                                pending_rows,
+                                uncategorized_rows,
+                                category_cache,
+                                new_categories,
+                            )
+                            self._report_import_progress(file_path, imported_count)
+
+                    if pending_rows:  # Final partial batch
+                        _write_import_batch(
+                            db,
+                            pending_rows,
+                            uncategorized_rows,
+                            category_cache,
+                            new_categories,
+                        )
+
                 # --- Commit all successfully processed transactions ---
                 db.commit()
                 status_msg = f"Import complete from '{os.path.basename(file_path)}'.\n"
                 status_msg += f"Successfully imported: {imported_count} transactions.\n"
                 if skipped_count > 0:
                     status_msg += f"Skipped: {skipped_count} rows due to errors (see console/log)."
-                    # You could print error_rows details here if desired
-                    print("\n--- Rows with Import Errors ---")
-                    for row_num, row_data, reason in error_rows:
-                        print(f"Row {row_num}: {reason} - Data: {row_data}")
-                    print("-----------------------------\n")
-                self.transaction_list_label.text = status_msg
+                    # Row problems are collected in the loop and logged once here
+                    Logger.warning(
+                        "BudgetScreen: Skipped %d CSV rows; first %d: %s",
+                        skipped_count,
+                        min(skipped_count, IMPORT_ERROR_LOG_LIMIT),
+                        "".join(
+                            f"\n  Row {row_num}: {reason} - Data: {row_data}"
+                            for row_num, row_data, reason in error_rows[
+                                :IMPORT_ERROR_LOG_LIMIT
+                            ]
+                        ),
+                    )
+                if new_categories:
+                    Logger.info(
+                        "BudgetScreen: Created %d new categories: %s",
+                        len(new_categories),
+                        ", ".join(new_categories),
+                    )
                 print(status_msg)
-                self.update_transaction_display()  # Refresh display
+                # A bulk import can leave the planner's row estimates far off.
+                # The rows are committed by now, so a failure here is only logged.
+                try:
+                    optimize_db()
+                except Exception:
+                    Logger.exception("BudgetScreen: Refreshing planner statistics failed")
+                return True, status_msg
 
         except FileNotFoundError:
             msg = f"Error: File not found at {file_path}"
             print(msg)
-            self.transaction_list_label.text = msg
+            return False, msg
         except UnicodeDecodeError:
             msg = f"Error: Could not decode file {os.path.basename(file_path)}. Try saving it as UTF-8."
             print(msg)
-            self.transaction_list_label.text = msg
+            return False, msg
         except Exception as e:
             # Catch broader errors during file open or commit
             msg = f"Error during CSV import process: {e}"
             print(msg)
-            self.transaction_list_label.text = msg
+            return False, msg
             # db.rollback() # Handled by SessionLocal context manager on error before commit
 
-        # Ensure popup closes even if errors occurred before commit
-        if self.filechooser_popup:
-            self.filechooser_popup.dismiss()
+    def _report_import_progress(self, file_path, imported_count):
+        """Called from the DB worker after each batch; updates the label on the UI thread."""
+        text = (
+            f"Importing '{os.path.basename(file_path)}'... "
+            f"{imported_count} transactions so far"
+        )
+        Clock.schedule_once(lambda dt: self._show_import_progress(text), 0)
+
+    def _show_import_progress(self, text):
+        if self.transaction_list_label:
+            self.transaction_list_label.text = text
+
+    def _finish_import(self, committed, status_msg):
+        """Shows the import result; runs on the UI thread."""
+        if not self.transaction_list_label:
+            return
+        if not committed:
+            # Nothing changed, so leave the error on screen instead of the list
+            self.transaction_list_label.text = status_msg
+            return
+        # Re-render with the new rows, then put the summary above the list
+        self.update_transaction_display()
+        self.transaction_list_label.text = (
+            f"{status_msg}\n{self.transaction_list_label.text}"
+        )
 
     def update_transaction_display(self):
         """Loads transactions from DB and updates the label (placeholder)."""
@@ -285,14 +475,35 @@ class BudgetScreen(Screen):
             print("Cannot update transaction display: Label not ready.")
             return
 
+        # Nothing was committed since the last render: reuse it without querying
+        generation = commit_generation()
+        if (
+            self._cached_display_text is not None
+            and generation == self._cached_display_generation
+        ):
+            self.transaction_list_label.text = self._cached_display_text
+            return
+
         try:
-            with SessionLocal() as db:
-                recent_transactions = (
-                    db.query(Transaction)
-                    .order_by(Transaction.date.desc())
-                    .limit(40)
-                    .all()
-                )  # Show more
+            with self._read_session() as db:
+                # One joined query: account and category names come back with each
+                # transaction instead of two extra lookups per row
+                recent_transactions = db.execute(
+                    select(
+                        Transaction.date,
+                        Transaction.description,
+                        Transaction.amount_dollars,
+                        Category.name,
+                        Account.name,
+                    )
+                    .join(Account, Transaction.account_id == Account.id, isouter=True)
+                    .join(Category, Transaction.category_id == Category.id, isouter=True)
+                    # id breaks ties between same-day rows. transactions.date is already
+                    # indexed and SQLite index entries end in the rowid (= id), so
+                    # ix_transactions_date serves this order with no sort step.
+                    .order_by(Transaction.date.desc(), Transaction.id.desc())
+                    .limit(40)  # Show more
+                ).all()
 
                 if not recent_transactions:
                     # Check if text indicates a recent import or error
@@ -309,34 +520,25 @@ class BudgetScreen(Screen):
                     return
 
                 # --- Format for display (Still placeholder - Needs RecycleView!) ---
-                display_text = "Recent Transactions:\n"
-                display_text += "{:<11} | {:<30} | {:>9} | {:<15} | {:<15}\n".format(
-                    "Date", "Description", "Amount", "Category", "Account"
-                )
-                display_text += "-" * 80 + "\n"  # Separator
-
-                for t in recent_transactions:
-                    # Use db.get for potentially better performance than querying in loop
-                    acc = db.get(Account, t.account_id)
-                    cat = db.get(Category, t.category_id)
-                    acc_name = acc.name if acc else "N/A"
-                    cat_name = (
-                        cat.name if cat else "Uncategorized"
-                    )  # Default if category missing
-
-                    display_text += (
-                        "{:<11} | {:<30} | {:>9.2f} | {:<15} | {:<15}\n".format(
-                            str(t.date),
-                            (t.description[:28] + "..")
-                            if len(t.description) > 30
-                            else t.description,
-                            t.amount,
-                            (cat_name[:13] + "..") if len(cat_name) > 15 else cat_name,
-                            (acc_name[:13] + "..") if len(acc_name) > 15 else acc_name,
+                parts = [_TRANSACTION_LIST_HEADER]
+                for t_date, t_description, t_amount, cat_name, acc_name in recent_transactions:
+                    acc_name = acc_name or "N/A"
+                    cat_name = cat_name or "Uncategorized"  # Default if category missing
+
+                    parts.append(
+                        _format_transaction_row(
+                            str(t_date),
+                            _trunc(t_description, 30),
+                            t_amount,
+                            _trunc(cat_name, 15),
+                            _trunc(acc_name, 15),
                         )
                     )
+                display_text = "".join(parts)
 
                 self.transaction_list_label.text = display_text
+                self._cached_display_text = display_text
+                self._cached_display_generation = generation
 
         except Exception as e:
             print(f"Error loading transactions from DB: {e}")
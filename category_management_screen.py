@@ -1,6 +1,7 @@
 from kivy.app import App
 from kivy.clock import Clock
-from kivy.metrics import dp
+from kivy.factory import Factory
+from kivy.logger import Logger
 from kivy.properties import (
     NumericProperty,
     StringProperty,
@@ -8,13 +9,37 @@ from kivy.properties import (
     ObjectProperty,
 )
 from kivy.uix.boxlayout import BoxLayout
-from kivy.uix.button import Button
-from kivy.uix.label import Label
-from kivy.uix.popup import Popup
 from kivy.uix.screenmanager import Screen
-from kivy.uix.textinput import TextInput
 
-from database import SessionLocal, Category, Transaction
+from sqlalchemy import select, insert, update, delete, func
+from sqlalchemy.exc import IntegrityError
+
+from database import (
+    Category,
+    Transaction,
+    uncategorized_id,
+)
+from list_screen import RecycleListScreenMixin
+
+# Linked transactions counted before the delete warning just says "N+"
+DEPENDENCY_COUNT_CAP = 1000
+
+# The category list: only the two columns the list shows (plain rows, no ORM
+# objects). Built once; it is run unchanged on every load
+CATEGORY_LIST_QUERY = select(Category.id, Category.name).order_by(Category.name)
+
+# Matches every spelling of the reserved category's name in SQL, so a write
+# can't touch it even if init_db() never recorded its id
+_NOT_RESERVED = func.lower(Category.name) != "uncategorized"
+
+
+def _is_reserved_category(category_id, category_name):
+    """True for the 'Uncategorized' category: by id once init_db() has
+    recorded it, and by name always (so the guard holds before that too)."""
+    reserved_id = uncategorized_id()
+    if reserved_id is not None and category_id == reserved_id:
+        return True
+    return category_name.lower() == "uncategorized"
 
 
 class CategoryListItem(BoxLayout):
@@ -22,117 +47,149 @@ class CategoryListItem(BoxLayout):
     category_name = StringProperty("")
     selected = BooleanProperty(False)
 
+    # Clock frame of the last handled tap, shared by all rows so that a burst of
+    # touch events (e.g. a double tap) triggers at most one selection per frame
+    _last_selection_frame = -1
+    # The category_management screen, resolved on the first touch of any row
+    _screen_ref = None
+
     def on_touch_down(self, touch):
         """Handles touch events for category list item."""
         if self.collide_point(*touch.pos):
-            print(
-                f"CategoryListItem touched: ID {self.category_id}, Name {self.category_name}"
+            if CategoryListItem._last_selection_frame == Clock.frames:
+                return True  # Already handled a tap this frame
+            CategoryListItem._last_selection_frame = Clock.frames
+
+            Logger.debug(
+                "CategoryManagement: Row touched: ID %s, Name %r",
+                self.category_id,
+                self.category_name,
             )
-            # Target the 'category_management' screen and its handler
-            App.get_running_app().root.get_screen(
-                "category_management"
-            ).handle_selection(self.category_id, self.category_name, self)
+            # Target the 'category_management' screen and its handler; looked up
+            # once and shared by every row (the root isn't built when rows are)
+            screen = CategoryListItem._screen_ref
+            if screen is None:
+                screen = CategoryListItem._screen_ref = (
+                    App.get_running_app().root.get_screen("category_management")
+                )
+            screen.handle_selection(self.category_id, self.category_name, self)
             return True
         return super().on_touch_down(touch)
 
 
-class CategoryManagementScreen(Screen):
+class CategoryManagementScreen(RecycleListScreenMixin, Screen):
     category_recycle_view = ObjectProperty(None)  # Adapted name
     status_label = ObjectProperty(None)  # Same name is fine
     selected_category_data = ObjectProperty(None, allownone=True)  # Adapted name
 
+    recycle_view_attr = "category_recycle_view"
+    row_id_key = "category_id"
+    row_name_key = "category_name"
+    log_title = "CategoryManagement"
+
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
+        # Reusable next-frame trigger for _setup_ui (avoids a new ClockEvent per entry)
+        self._setup_trigger = Clock.create_trigger(self._setup_ui, 0)
+        # Index (in the RecycleView data) of the selected row, or None
+        self._selected_idx = None
+        # category_id -> index in the RecycleView data
+        self._id_index = {}
+        # Dialogs are built on first use and reused; the *_target attributes
+        # say which category the open dialog acts on
+        self._add_popup = None
+        self._edit_popup = None
+        self._delete_popup = None
+        self._delete_blocked_popup = None
+        self._edit_target = None
+        self._delete_target = None
 
     def on_enter(self, *args):
         """Called when the screen is displayed."""
-        print("Entering Category Management Screen.")
+        Logger.debug("CategoryManagement: Entering screen")
         self.deselect_category()  # Clear selection when entering
-        Clock.schedule_once(self._setup_ui, 0)
+        self._setup_trigger()
 
     def _setup_ui(self, dt):
         if not self.category_recycle_view or not self.status_label:
-            print("Error: Category Management UI elements not ready.")
-            if self.status_label:
-                self.status_label.text = "Error loading UI."
+            Logger.error("CategoryManagement: UI elements not ready")
+            self._set_status("Error loading UI.")
             return
-        self.status_label.text = "Manage your categories."
+        self._set_status("Manage your categories.")
         self.load_categories_for_rv()  # Call category loader
 
     def load_categories_for_rv(self):
-        """Loads categories from DB and prepares data for RecycleView."""
+        """Loads categories from DB (on the worker thread) into the RecycleView."""
         if not self.category_recycle_view:
-            self.status_label.text = "Error: RecycleView not found."
+            self._set_status("Error: RecycleView not found.")
             return
 
-        print("Loading categories for RecycleView...")
-        try:
-            with SessionLocal() as db:
-                # Query Category model
-                categories = db.query(Category).order_by(Category.name).all()
-                # Adapt data dictionary keys
-                self.category_recycle_view.data = [
-                    {
-                        "category_id": cat.id,
-                        "category_name": cat.name,
-                        "selected": False,
-                    }
-                    for cat in categories
-                ]
-                self.status_label.text = f"Loaded {len(categories)} categories."
-                self.deselect_category()
-
-        except Exception as e:
-            error_msg = f"Error loading categories: {e}"
-            self.status_label.text = error_msg
-            print(error_msg)
-
-        self.category_recycle_view.refresh_from_data()
+        Logger.debug("CategoryManagement: Loading categories for RecycleView")
+
+        def work(db):
+            return db.execute(CATEGORY_LIST_QUERY).all()
+
+        def done(categories, error):
+            if error is not None:
+                error_msg = f"Error loading categories: {error}"
+                self._set_status(error_msg)
+                Logger.error("CategoryManagement: %s", error_msg)
+                return
+
+            # Adapt data dictionary keys
+            self.category_recycle_view.data = [
+                {
+                    "category_id": cat_id,
+                    "category_name": cat_name,
+                    "selected": False,
+                }
+                for cat_id, cat_name in categories
+            ]
+            self._selected_idx = None
+            self._id_index = {}
+            self._reindex_rows()
+            self._set_status(f"Loaded {len(categories)} categories.")
+            self.deselect_category()
+
+        self._run_in_background(work, done)
 
     def handle_selection(self, category_id, category_name, view_instance):
         """Manages selecting/deselecting category items in the RecycleView."""
-        print(f"Selection attempt on Category ID: {category_id}, Name: {category_name}")
-
-        new_data = []
-        item_selected = False
-        # Use the correct recycle view property
-        for item_data in self.category_recycle_view.data:
-            current_id = item_data["category_id"]  # Use correct key
-            if current_id == category_id:
-                item_data["selected"] = not item_data["selected"]
-                if item_data["selected"]:
-                    # Store selected category data
-                    self.selected_category_data = {
-                        "id": category_id,
-                        "name": category_name,
-                    }
-                    self.status_label.text = f"Selected: {category_name}"
-                    item_selected = True
-                else:
-                    self.deselect_category()  # Use category deselect
-            else:
-                item_data["selected"] = False
-            new_data.append(item_data)
+        Logger.debug("CategoryManagement: Selection attempt on ID %s", category_id)
 
-        if not item_selected:
-            self.deselect_category()  # Use category deselect
+        idx = self._id_index.get(category_id)
+        if idx is None:
+            return True
+
+        if self.category_recycle_view.data[idx]["selected"]:
+            # Tapping the selected row deselects it (helper clears status too)
+            self.deselect_category()
+            return True
 
-        self.category_recycle_view.data = new_data
-        self.category_recycle_view.refresh_from_data()  # Refresh needed
+        # Single selection: only the previously selected row and the tapped row
+        # change, so replace just those two entries instead of rebuilding data
+        if self._selected_idx is not None:
+            self._set_row_selected(self._selected_idx, False)
+        self._set_row_selected(idx, True)
+        self._selected_idx = idx
+        # Store selected category data
+        self.selected_category_data = {
+            "id": category_id,
+            "name": category_name,
+        }
+        self._set_status(f"Selected: {category_name}")
 
         return True
 
     def deselect_category(self):
         """Helper to clear category selection state."""
         self.selected_category_data = None
+        if self._selected_idx is not None:
+            # Clear the highlight on the previously selected row (single-select)
+            self._set_row_selected(self._selected_idx, False)
+            self._selected_idx = None
         if self.status_label and not self.status_label.text.startswith("Error"):
-            self.status_label.text = (
-                "Manage your categories. Select one to edit/delete."
-            )
-        # Optional: Clear visual selection in data (handle_selection does this)
-        # for item_data in self.category_recycle_view.data:
-        #     item_data['selected'] = False
-        # self.category_recycle_view.refresh_from_data()
+            self._set_status("Manage your categories. Select one to edit/delete.")
 
     def get_selected_category(self):
         """Returns the data dict of the selected category or None."""
@@ -140,332 +197,334 @@ class CategoryManagementScreen(Screen):
 
     def open_add_category_popup(self):
         """Opens a popup to add a new category."""
-        content = BoxLayout(orientation="vertical", padding=dp(10), spacing=dp(10))
-        popup_label = Label(text="Enter new category name:")  # Adapted text
-        name_input = TextInput(
-            multiline=False, hint_text="Category Name"
-        )  # Adapted hint
-        button_box = BoxLayout(size_hint_y=None, height=dp(50), spacing=dp(10))
-        save_button = Button(text="Save")
-        cancel_button = Button(text="Cancel")
-        button_box.add_widget(save_button)
-        button_box.add_widget(cancel_button)
-
-        content.add_widget(popup_label)
-        content.add_widget(name_input)
-        content.add_widget(button_box)
-
-        popup = Popup(
-            title="Add Category", content=content, size_hint=(0.7, 0.4)
-        )  # Adapted title
-
-        def save_action(instance):
-            category_name = name_input.text.strip()
-            if category_name:
-                self.add_category(category_name)  # Call category add method
-                popup.dismiss()
-            else:
-                print("Category name cannot be empty.")
-                self.status_label.text = "Category name cannot be empty."
-
-        save_button.bind(on_press=save_action)
-        cancel_button.bind(on_press=popup.dismiss)
-        popup.open()
+        # Layout lives in budget.kv (<AddCategoryPopup@Popup>); built once, reused
+        if self._add_popup is None:
+            self._add_popup = Factory.AddCategoryPopup()
+            self._add_popup.ids.save_button.bind(on_press=self._save_add_popup)
+        self._add_popup.ids.name_input.text = ""
+        self._add_popup.open()
+
+    def _save_add_popup(self, instance):
+        category_name = self._add_popup.ids.name_input.text.strip()
+        if category_name:
+            self.add_category(category_name)  # Call category add method
+            self._add_popup.dismiss()
+        else:
+            self._set_status("Category name cannot be empty.")
 
     def add_category(self, name):
         """Adds a new category to the database."""
 
         # Prevent adding "Uncategorized" manually if it should be default only
         if name.lower() == "uncategorized":
-            self.status_label.text = "'Uncategorized' is a reserved name."
-            print("Attempted to add reserved category name 'Uncategorized'.")
+            self._set_status("'Uncategorized' is a reserved name.")
+            Logger.warning(
+                "CategoryManagement: Attempted to add reserved name 'Uncategorized'"
+            )
             return
 
-        print(f"Attempting to add category: {name}")
-        try:
-            with SessionLocal() as db:
-                # Use Category model
-                exists = db.query(Category).filter(Category.name == name).first()
-                if exists:
-                    self.status_label.text = f"Category '{name}' already exists."
-                    print(f"Category '{name}' already exists.")
-                    return
-
-                new_category = Category(name=name)  # Create Category object
-                db.add(new_category)
+        Logger.debug("CategoryManagement: Adding category %r", name)
+
+        def work(db):
+            # The unique index on Category.name rejects duplicates, no pre-check needed
+            # RETURNING hands back the new id from the INSERT itself
+            try:
+                new_id = db.execute(
+                    insert(Category).values(name=name).returning(Category.id)
+                ).scalar_one()
                 db.commit()
-                print(f"Category '{name}' added successfully.")
-                self.status_label.text = f"Category '{name}' added."
-                self.load_categories_for_rv()  # Refresh category list
+            except IntegrityError:
+                db.rollback()
+                return None
+            return new_id
+
+        def done(new_id, error):
+            if error is not None:
+                error_msg = f"Error adding category '{name}': {error}"
+                self._set_status(error_msg)
+                Logger.error("CategoryManagement: %s", error_msg)
+                return
+            if new_id is None:
+                self._set_status(f"Category '{name}' already exists.")
+                return
+
+            Logger.info("CategoryManagement: Category %r added", name)
+            self._set_status(f"Category '{name}' added.")
+            # Insert the new row in place instead of reloading the whole list
+            self._insert_row(
+                {"category_id": new_id, "category_name": name, "selected": False}
+            )
 
-        except Exception as e:
-            # db.rollback() # Handled by context manager
-            error_msg = f"Error adding category '{name}': {e}"
-            self.status_label.text = error_msg
-            print(error_msg)
+        self._run_in_background(work, done)
 
     def open_edit_category_popup(self):
         selected = self.get_selected_category()  # Use category getter
         if not selected:
-            if self.status_label:
-                self.status_label.text = "Select a category to edit."
+            self._set_status("Select a category to edit.")
             return
 
         category_id = selected["id"]
         category_name = selected["name"]
 
         # Prevent editing "Uncategorized"
-        if category_name.lower() == "uncategorized":
-            self.status_label.text = "Cannot edit the default 'Uncategorized' category."
-            print("Attempted to edit reserved category 'Uncategorized'.")
+        if _is_reserved_category(category_id, category_name):
+            self._set_status("Cannot edit the default 'Uncategorized' category.")
+            Logger.warning(
+                "CategoryManagement: Attempted to edit reserved category 'Uncategorized'"
+            )
             return
 
-        print(
-            f"Opening edit popup for Category ID: {category_id}, Name: {category_name}"
-        )
+        Logger.debug("CategoryManagement: Opening edit popup for ID %s", category_id)
 
         try:
-            content = BoxLayout(orientation="vertical", padding=dp(10), spacing=dp(10))
-            popup_label = Label(
-                text=f"Enter new name for '{category_name}':"
-            )  # Adapted text
-            name_input = TextInput(
-                text=category_name, multiline=False, hint_text="New Category Name"
-            )  # Adapted hint
-            button_box = BoxLayout(size_hint_y=None, height=dp(50), spacing=dp(10))
-            save_button = Button(text="Save Changes")
-            cancel_button = Button(text="Cancel")
-            button_box.add_widget(save_button)
-            button_box.add_widget(cancel_button)
-            content.add_widget(popup_label)
-            content.add_widget(name_input)
-            content.add_widget(button_box)
-            popup = Popup(
-                title="Edit Category", content=content, size_hint=(0.7, 0.4)
-            )  # Adapted title
-
-            def save_edit_action(instance):
-                new_name = name_input.text.strip()
-                if new_name and new_name != category_name:
-                    # Prevent renaming TO "Uncategorized"
-                    if new_name.lower() == "uncategorized":
-                        if self.status_label:
-                            self.status_label.text = (
-                                "'Uncategorized' is a reserved name."
-                            )
-                        print("Attempted to rename category to 'Uncategorized'.")
-                        # Keep popup open or dismiss? Dismiss is simpler.
-                        # popup.dismiss() # Or just don't dismiss
-                        return  # Stop processing
-                    self.edit_category(
-                        category_id, new_name
-                    )  # Call category edit method
-                    popup.dismiss()
-                elif not new_name:
-                    if self.status_label:
-                        self.status_label.text = "Category name cannot be empty."
-                else:
-                    popup.dismiss()
-
-            save_button.bind(on_press=save_edit_action)
-            cancel_button.bind(on_press=popup.dismiss)
-            popup.open()
-        except Exception as e:
-            print(f"Error opening Edit Category popup: {e}")
-            if self.status_label:
-                self.status_label.text = "Error opening edit dialog."
+            # Layout lives in budget.kv (<EditCategoryPopup@Popup>); built once, reused
+            if self._edit_popup is None:
+                self._edit_popup = Factory.EditCategoryPopup()
+                self._edit_popup.ids.save_button.bind(on_press=self._save_edit_popup)
+
+            # Point the reused dialog at the selected category
+            self._edit_target = (category_id, category_name)
+            self._edit_popup.ids.prompt_label.text = (
+                f"Enter new name for '{category_name}':"
+            )
+            self._edit_popup.ids.name_input.text = category_name
+            self._edit_popup.open()
+        except Exception:
+            Logger.exception("CategoryManagement: Error opening Edit Category popup")
+            self._set_status("Error opening edit dialog.")
+
+    def _save_edit_popup(self, instance):
+        category_id, category_name = self._edit_target
+        new_name = self._edit_popup.ids.name_input.text.strip()
+        if new_name and new_name != category_name:
+            # Prevent renaming TO "Uncategorized"
+            if new_name.lower() == "uncategorized":
+                self._set_status("'Uncategorized' is a reserved name.")
+                Logger.warning(
+                    "CategoryManagement: Attempted to rename a category to 'Uncategorized'"
+                )
+                return  # Stop processing; the dialog stays open
+            self.edit_category(category_id, new_name)  # Call category edit method
+            self._edit_popup.dismiss()
+        elif not new_name:
+            self._set_status("Category name cannot be empty.")
+        else:
+            self._edit_popup.dismiss()
 
     def edit_category(self, category_id, new_name):
         if not new_name:
-            self.status_label.text = "New category name cannot be empty."
+            self._set_status("New category name cannot be empty.")
             return
         # Redundant check, also done in popup save action, but good defense
         if new_name.lower() == "uncategorized":
-            self.status_label.text = "'Uncategorized' is a reserved name."
+            self._set_status("'Uncategorized' is a reserved name.")
+            return
+        # Prevent editing "Uncategorized" again (defense in depth)
+        if category_id == uncategorized_id():
+            self._set_status("Cannot edit the default 'Uncategorized' category.")
+            Logger.warning(
+                "CategoryManagement: Attempted to edit reserved category 'Uncategorized'"
+            )
             return
 
-        print(f"Attempting to edit category ID {category_id} to '{new_name}'")
-        try:
-            with SessionLocal() as db:
-                # Use Category model
-                exists = (
-                    db.query(Category)
-                    .filter(Category.name == new_name, Category.id != category_id)
-                    .first()
-                )
-                if exists:
-                    self.status_label.text = (
-                        f"Another category named '{new_name}' already exists."
-                    )
-                    print(f"Category '{new_name}' already exists.")
-                    return
+        Logger.debug(
+            "CategoryManagement: Renaming category ID %s to %r", category_id, new_name
+        )
 
-                category_to_edit = (
-                    db.query(Category).filter(Category.id == category_id).first()
+        def work(db):
+            # One UPDATE; RETURNING tells us whether the row existed (and
+            # wasn't the reserved category)
+            try:
+                updated_id = db.execute(
+                    update(Category)
+                    .where(Category.id == category_id, _NOT_RESERVED)
+                    .values(name=new_name)
+                    .returning(Category.id)
+                ).scalar_one_or_none()
+                db.commit()
+            except IntegrityError:
+                # Another category already has this name (unique index)
+                db.rollback()
+                return "exists"
+            return "updated" if updated_id is not None else "missing"
+
+        def done(outcome, error):
+            if error is not None:
+                error_msg = f"Error editing category ID {category_id}: {error}"
+                self._set_status(error_msg)
+                Logger.error("CategoryManagement: %s", error_msg)
+                return
+            if outcome == "missing":
+                self._set_status(
+                    f"Error: Category ID {category_id} not found or can't be edited."
                 )
-                # Prevent editing "Uncategorized" again (defense in depth)
-                if (
-                    category_to_edit
-                    and category_to_edit.name.lower() == "uncategorized"
-                ):
-                    self.status_label.text = (
-                        "Cannot edit the default 'Uncategorized' category."
-                    )
-                    print(
-                        "Attempted to edit reserved category 'Uncategorized' directly."
-                    )
-                    return
-
-                if category_to_edit:
-                    category_to_edit.name = new_name
-                    db.commit()
-                    print(f"Category ID {category_id} updated to '{new_name}'.")
-                    self.status_label.text = f"Category '{new_name}' updated."
-                    self.load_categories_for_rv()  # Refresh category list
-                else:
-                    self.status_label.text = (
-                        f"Error: Category ID {category_id} not found for editing."
-                    )
-                    print(f"Category ID {category_id} not found.")
+                Logger.warning(
+                    "CategoryManagement: Category ID %s not found for editing",
+                    category_id,
+                )
+                return
+            if outcome == "exists":
+                self._set_status(f"Another category named '{new_name}' already exists.")
+                return
 
-        except Exception as e:
-            # db.rollback() # Handled by context manager
-            error_msg = f"Error editing category ID {category_id}: {e}"
-            self.status_label.text = error_msg
-            print(error_msg)
+            Logger.info(
+                "CategoryManagement: Category ID %s renamed to %r", category_id, new_name
+            )
+            self._set_status(f"Category '{new_name}' updated.")
+            # Patch the existing row; re-insert it so the list stays sorted
+            idx = self._id_index.get(category_id)
+            if idx is not None:
+                item_data = self._remove_row(idx)
+                item_data["category_name"] = new_name
+                self._insert_row(item_data)
+                if item_data["selected"]:
+                    self.selected_category_data = {
+                        "id": category_id,
+                        "name": new_name,
+                    }
+
+        self._run_in_background(work, done)
 
     def confirm_delete_category(self):
         selected = self.get_selected_category()  # Use category getter
         if not selected:
-            if self.status_label:
-                self.status_label.text = "Select a category to delete."
+            self._set_status("Select a category to delete.")
             return
 
         category_id = selected["id"]
         category_name = selected["name"]
 
         # Prevent deleting "Uncategorized"
-        if category_name.lower() == "uncategorized":
-            self.status_label.text = (
-                "Cannot delete the default 'Uncategorized' category."
+        if _is_reserved_category(category_id, category_name):
+            self._set_status("Cannot delete the default 'Uncategorized' category.")
+            Logger.warning(
+                "CategoryManagement: Attempted to delete reserved category 'Uncategorized'"
             )
-            print("Attempted to delete reserved category 'Uncategorized'.")
             return
 
-        print(
-            f"Opening delete confirmation for Category ID: {category_id}, Name: {category_name}"
+        Logger.debug(
+            "CategoryManagement: Opening delete confirmation for ID %s", category_id
         )
 
-        dependency_text = self.check_category_dependencies(
-            category_id
-        )  # Call category dependency check
+        def done(dependency_text, error):
+            if error is not None:
+                dependency_text = f"Error checking dependencies: {error}"
+            self._open_delete_category_popup(category_id, category_name, dependency_text)
 
-        try:
-            content = BoxLayout(orientation="vertical", padding=dp(10), spacing=dp(10))
-            popup = None
+        # Call category dependency check on the worker; the dialog opens when it's back
+        self._run_in_background(
+            lambda db: self.check_category_dependencies(category_id, db), done
+        )
 
+    def _open_delete_category_popup(self, category_id, category_name, dependency_text):
+        """Shows the delete confirmation, or the blocked dialog if dependency_text is set."""
+        try:
             if dependency_text:
-                warning_label = Label(
-                    text=f"Cannot delete '{category_name}':\n{dependency_text}",
-                    halign="center",
-                )
-                ok_button = Button(text="OK", size_hint_y=None, height=dp(50))
-                content.add_widget(warning_label)
-                content.add_widget(ok_button)
-                popup = Popup(
-                    title="Deletion Prevented", content=content, size_hint=(0.7, 0.4)
+                # Shared dialog layouts from budget.kv (<DeleteBlockedPopup@Popup>);
+                # this screen keeps its own instances, built once
+                if self._delete_blocked_popup is None:
+                    self._delete_blocked_popup = Factory.DeleteBlockedPopup()
+                self._delete_blocked_popup.ids.message_label.text = (
+                    f"Cannot delete '{category_name}':\n{dependency_text}"
                 )
-                ok_button.bind(on_press=popup.dismiss)
+                self._delete_blocked_popup.open()
             else:
-                confirm_label = Label(
-                    text=f"Are you sure you want to delete category '{category_name}'?\nThis action cannot be undone.",
-                    halign="center",
-                )  # Adapted text
-                button_box = BoxLayout(size_hint_y=None, height=dp(50), spacing=dp(10))
-                delete_button = Button(text="Delete", background_color=(1, 0, 0, 1))
-                cancel_button = Button(text="Cancel")
-                button_box.add_widget(delete_button)
-                button_box.add_widget(cancel_button)
-                content.add_widget(confirm_label)
-                content.add_widget(button_box)
-                popup = Popup(
-                    title="Confirm Deletion", content=content, size_hint=(0.7, 0.4)
-                )  # Adapted title
-
-                def delete_action(instance):
-                    self.delete_category(category_id)  # Call category delete method
-                    popup.dismiss()
-
-                delete_button.bind(on_press=delete_action)
-                cancel_button.bind(on_press=popup.dismiss)
-
-            if popup:
-                popup.open()
-            else:
-                raise Exception("Popup creation failed unexpectedly.")
+                # <DeleteConfirmPopup@Popup> in budget.kv
+                if self._delete_popup is None:
+                    self._delete_popup = Factory.DeleteConfirmPopup()
+                    self._delete_popup.ids.delete_button.bind(
+                        on_press=self._confirm_delete_popup
+                    )
+                self._delete_target = category_id
+                self._delete_popup.ids.message_label.text = f"Are you sure you want to delete category '{category_name}'?\nThis action cannot be undone."
+                self._delete_popup.open()
 
-        except Exception as e:
-            print(f"Error opening Delete Confirmation popup: {e}")
-            if self.status_label:
-                self.status_label.text = "Error opening delete dialog."
+        except Exception:
+            Logger.exception("CategoryManagement: Error opening Delete Confirmation popup")
+            self._set_status("Error opening delete dialog.")
 
-    def check_category_dependencies(self, category_id):
+    def _confirm_delete_popup(self, instance):
+        self.delete_category(self._delete_target)  # Call category delete method
+        self._delete_popup.dismiss()
+
+    def check_category_dependencies(self, category_id, db):
         """Checks if a category has linked transactions. Returns warning text or None."""
         try:
-            with SessionLocal() as db:
-                # Check only Transactions linked to this category
-                transaction_count = (
-                    db.query(Transaction)
-                    .filter(Transaction.category_id == category_id)
-                    .count()
+            # Check only Transactions linked to this category. Counting over a
+            # LIMITed subquery stops the index scan early for big categories;
+            # the dialog only needs "any", plus a number for display.
+            transaction_count = db.execute(
+                select(func.count()).select_from(
+                    select(Transaction.id)
+                    .where(Transaction.category_id == category_id)
+                    .limit(DEPENDENCY_COUNT_CAP + 1)
+                    .subquery()
                 )
-                warnings = []
-                if transaction_count > 0:
-                    warnings.append(f"{transaction_count} linked transaction(s)")
-                # No snapshot entries for categories
-                return "\n".join(warnings) if warnings else None
+            ).scalar_one()
+            warnings = []
+            if transaction_count > DEPENDENCY_COUNT_CAP:
+                warnings.append(f"{DEPENDENCY_COUNT_CAP}+ linked transaction(s)")
+            elif transaction_count > 0:
+                warnings.append(f"{transaction_count} linked transaction(s)")
+            # No snapshot entries for categories
+            return "\n".join(warnings) if warnings else None
         except Exception as e:
-            print(f"Error checking dependencies for category {category_id}: {e}")
+            Logger.exception(
+                "CategoryManagement: Error checking dependencies for category %s",
+                category_id,
+            )
             return f"Error checking dependencies: {e}"
 
     def delete_category(self, category_id):
+        """Deletes a category (the write runs on a worker thread)."""
         # Dependency check is done in confirm_delete_category
         # Redundant check for "Uncategorized" (defense in depth)
-        try:
-            with SessionLocal() as db_check:
-                cat_to_check = db_check.get(Category, category_id)
-                if cat_to_check and cat_to_check.name.lower() == "uncategorized":
-                    if self.status_label:
-                        self.status_label.text = "Cannot delete 'Uncategorized'."
-                    return
-        except Exception:
-            pass  # Ignore error here, main delete block will handle db issues
+        if category_id == uncategorized_id():
+            self._set_status("Cannot delete 'Uncategorized'.")
+            return
 
-        print(f"Attempting to delete category ID {category_id}")
-        try:
-            with SessionLocal() as db:
-                category_to_delete = (
-                    db.query(Category).filter(Category.id == category_id).first()
+        Logger.debug("CategoryManagement: Deleting category ID %s", category_id)
+
+        def work(db):
+            # Core DELETE (the ORM delete would first load the category's
+            # transactions collection); RETURNING gives the name for the message
+            category_name = db.execute(
+                delete(Category)
+                .where(Category.id == category_id, _NOT_RESERVED)
+                .returning(Category.name)
+            ).scalar_one_or_none()
+            if category_name is None:
+                db.rollback()
+                return None
+            db.commit()
+            return category_name
+
+        def done(category_name, error):
+            if error is not None:
+                error_msg = f"Error deleting category ID {category_id}: {error}"
+                self._set_status(error_msg)
+                Logger.error("CategoryManagement: %s", error_msg)
+                return
+            if category_name is None:
+                self._set_status(
+                    f"Error: Category ID {category_id} not found or can't be deleted."
+                )
+                Logger.warning(
+                    "CategoryManagement: Category ID %s not found for deletion",
+                    category_id,
                 )
-                if category_to_delete:
-                    category_name = category_to_delete.name
-                    db.delete(category_to_delete)
-                    db.commit()
-                    print(f"Category '{category_name}' (ID: {category_id}) deleted.")
-                    if self.status_label:
-                        self.status_label.text = f"Category '{category_name}' deleted."
-                    self.load_categories_for_rv()  # Refresh category list
-                    self.deselect_category()  # Clear selection
-                else:
-                    if self.status_label:
-                        self.status_label.text = (
-                            f"Error: Category ID {category_id} not found."
-                        )
-                    print(f"Category ID {category_id} not found for deletion.")
+                return
 
-        except Exception as e:
-            # db.rollback() # Handled by context manager
-            error_msg = f"Error deleting category ID {category_id}: {e}"
-            if self.status_label:
-                self.status_label.text = error_msg
-            print(error_msg)
+            Logger.info(
+                "CategoryManagement: Category %r (ID: %s) deleted",
+                category_name,
+                category_id,
+            )
+            self._set_status(f"Category '{category_name}' deleted.")
+            # Drop just the deleted row instead of reloading the list
+            idx = self._id_index.get(category_id)
+            if idx is not None:
+                self._remove_row(idx)
+            self.deselect_category()  # Clear selection
+
+        self._run_in_background(work, done)
@@ -1,32 +1,176 @@
+import datetime
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from decimal import Decimal, ROUND_HALF_UP
+
 from sqlalchemy import (
     create_engine,
+    event,
     Column,
     Integer,
     String,
-    Float,
-    Date,
     ForeignKey,
     DateTime,
+    Index,
+    select,
+    insert,
+    inspect,
 )
+from sqlalchemy.types import TypeDecorator
+from sqlalchemy.ext.hybrid import hybrid_property
 from sqlalchemy.orm import sessionmaker, relationship, declarative_base
+from sqlalchemy.pool import QueuePool
 from sqlalchemy.sql import func  # For default timestamp
 
 # --- Database Setup ---
 DATABASE_URL = "sqlite:///budget.db"  # Creates budget.db in the same directory
 
 # create_engine is the starting point for any SQLAlchemy application.
-# connect_args is needed for SQLite to enforce foreign key constraints.
+# Per-connection SQLite settings (WAL, foreign keys, ...) are in set_sqlite_pragmas.
+# QueuePool keeps opened (and PRAGMA-configured) connections for reuse across
+# sessions. It is what SQLAlchemy 2.x picks for file databases anyway; spelled
+# out so nobody swaps in StaticPool, whose single shared connection would be
+# used by the UI thread and the DB worker at the same time.
+# Only the UI thread and the single DB worker check connections out, so five
+# pooled connections cover every session the app holds at once; overflow is
+# just headroom. No pool_pre_ping: a local file connection cannot go stale,
+# and the ping would cost an extra SELECT on every checkout.
 engine = create_engine(
     DATABASE_URL,
     connect_args={"check_same_thread": False},  # Needed for SQLite threading
+    poolclass=QueuePool,
+    pool_size=5,
+    max_overflow=10,
 )
 
+
+@event.listens_for(engine, "connect")
+def set_sqlite_pragmas(dbapi_connection, connection_record):
+    """Applies SQLite settings to every new DB connection."""
+    cursor = dbapi_connection.cursor()
+    # Write-ahead logging lets the UI thread keep reading while a worker thread commits
+    cursor.execute("PRAGMA journal_mode=WAL")
+    # In WAL mode NORMAL only fsyncs at checkpoints; a crash can lose the last
+    # commits but never corrupts the file. Much cheaper commits on phone storage.
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    # Temp tables/indices (sorts, GROUP BY) in memory; ~20 MB page cache
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.execute("PRAGMA cache_size=-20000")
+    # SQLite ignores FOREIGN KEY clauses unless this is set on each connection
+    cursor.execute("PRAGMA foreign_keys=ON")
+    cursor.close()
+
+
+# Single background thread for DB work, shared by all screens. Running queries
+# here keeps the Kivy main loop free; one worker also serializes writes, which
+# is what SQLite wants anyway. Results go back to the UI via Clock.schedule_once,
+# and each job must open its own session (sessions aren't thread-safe).
+DB_EXECUTOR = ThreadPoolExecutor(max_workers=1, thread_name_prefix="db")
+
+# Set once init_db() has finished (successfully or not). The app runs init_db
+# as the first DB_EXECUTOR job, so queued background work already waits for
+# it; code that queries on the UI thread must check this first.
+DB_READY = threading.Event()
+
+
+# --- Debug helpers ---
+# Set BUDGET_DEBUG_QUERIES=1 to have hot paths check how many queries they run,
+# which catches N+1 regressions (e.g. a relationship lazy-loading per row).
+DEBUG_QUERY_COUNTS = os.environ.get("BUDGET_DEBUG_QUERIES") == "1"
+
+
+# (thread id or None for any thread, statement list) for each open
+# count_queries() scope. One listener, registered here, feeds them all; scopes
+# only add and remove entries, so the engine's listener collection is never
+# changed while another thread is running a query.
+_query_scopes = []
+_query_scopes_lock = threading.Lock()
+
+
+@event.listens_for(engine, "before_cursor_execute")
+def _collect_query(conn, cursor, statement, parameters, context, executemany):
+    if not _query_scopes:
+        return  # No scope open (always the case unless debugging)
+    thread_id = threading.get_ident()
+    with _query_scopes_lock:
+        for scope_thread_id, queries in _query_scopes:
+            if scope_thread_id is None or scope_thread_id == thread_id:
+                queries.append(statement)
+
+
+@contextmanager
+def count_queries(enabled=True, all_threads=False):
+    """
+    Collects the SQL statements executed on the engine while the block runs.
+    Only statements from the calling thread are counted, unless all_threads
+    is set (e.g. to include the DB worker's queries). Yields the list, which
+    stays empty if not enabled.
+    """
+    queries = []
+    if not enabled:
+        yield queries
+        return
+
+    scope = (None if all_threads else threading.get_ident(), queries)
+    with _query_scopes_lock:
+        _query_scopes.append(scope)
+    try:
+        yield queries
+    finally:
+        with _query_scopes_lock:
+            _query_scopes.remove(scope)
+
+
 # SessionLocal instances will be the actual database session handles.
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# expire_on_commit=False keeps loaded attributes readable after commit(), so
+# building a status message from a just-saved object doesn't re-SELECT it.
+SessionLocal = sessionmaker(
+    autocommit=False, autoflush=False, expire_on_commit=False, bind=engine
+)
+
+# Bumped after every commit made through SessionLocal (from any thread), so a
+# screen can cache what it read and only re-query once the data has changed.
+_commit_generation = 0
+
+
+@event.listens_for(SessionLocal, "after_commit")
+def _bump_commit_generation(session):
+    global _commit_generation
+    _commit_generation += 1
+
+
+def commit_generation():
+    """Returns a counter that changes whenever any session commits."""
+    return _commit_generation
+
 
 # Base class for our declarative models.
 Base = declarative_base()
 
+# Day number of 1970-01-01 in date.toordinal() terms
+_EPOCH_ORDINAL = datetime.date(1970, 1, 1).toordinal()
+
+
+class EpochDay(TypeDecorator):
+    """
+    A datetime.date stored as INTEGER days since 1970-01-01. Smaller than
+    SQLite's 10-character date text and compared as a plain integer, while
+    Python code still reads and writes date objects.
+    """
+
+    impl = Integer
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        return None if value is None else value.toordinal() - _EPOCH_ORDINAL
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        return datetime.date.fromordinal(value + _EPOCH_ORDINAL)
+
 # --- Data Models (Tables) ---
 
 
@@ -39,8 +183,11 @@ class Account(Base):
     # balance = Column(Float, default=0.0) # Storing balance directly can be tricky due to transactions
     # It's often better to calculate balance from transactions or store snapshots
 
-    # Relationship: An account can have many transactions
-    transactions = relationship("Transaction", back_populates="account")
+    # Relationship: An account can have many transactions (queried directly,
+    # never walked, so loading the collection is an error like Category's)
+    transactions = relationship(
+        "Transaction", back_populates="account", lazy="raise_on_sql"
+    )
     # Relationship: An account can have many snapshot entries
     snapshots = relationship("SnapshotEntry", back_populates="account", cascade="all, delete-orphan")
 
@@ -52,11 +199,11 @@ class Transaction(Base):
     __tablename__ = "transactions"
 
     id = Column(Integer, primary_key=True, index=True)
-    date = Column(Date, nullable=False, index=True)
+    date = Column(EpochDay, nullable=False, index=True)
     description = Column(String, nullable=False)
-    amount = Column(
-        Float, nullable=False
-    )  # Use negative for expenses, positive for income
+    # Whole cents, so sums are exact integer arithmetic (see amount_dollars).
+    # Use negative for expenses, positive for income
+    amount = Column(Integer, nullable=False)
     category_id = Column(
         Integer, ForeignKey("categories.id"), nullable=True, index=True
     )  # Link to Category
@@ -65,9 +212,21 @@ class Transaction(Base):
     )  # Link to Account
     notes = Column(String, nullable=True)
 
-    # Relationships
-    category = relationship("Category", back_populates="transactions")
-    account = relationship("Account", back_populates="transactions")
+    # Relationships. Screens select the columns they show (with joins) instead
+    # of walking these per row, so a lazy load here would be an N+1 bug:
+    # raise_on_sql turns it into an error. Objects already in the session
+    # still resolve, and call sites can opt in with selectinload().
+    category = relationship(
+        "Category", back_populates="transactions", lazy="raise_on_sql"
+    )
+    account = relationship(
+        "Account", back_populates="transactions", lazy="raise_on_sql"
+    )
+
+    @hybrid_property
+    def amount_dollars(self):
+        """The amount in dollars, for display; usable in queries too."""
+        return self.amount / 100.0
 
     def __repr__(self):
         return f"<Transaction(id={self.id}, date={self.date}, desc='{self.description[:20]}', amount={self.amount})>"
@@ -80,8 +239,12 @@ class Category(Base):
     name = Column(String, unique=True, index=True, nullable=False)
     # budgeted_amount = Column(Float, default=0.0) # Optional: For budget planning
 
-    # Relationship: A category can have many transactions
-    transactions = relationship("Transaction", back_populates="category")
+    # Relationship: A category can have many transactions. Nothing walks this
+    # collection (counts are queried directly), so loading it is made an error
+    # rather than a silent per-category SELECT.
+    transactions = relationship(
+        "Transaction", back_populates="category", lazy="raise_on_sql"
+    )
 
     def __repr__(self):
         return f"<Category(id={self.id}, name='{self.name}')>"
@@ -95,9 +258,14 @@ class Snapshot(Base):
     )
     notes = Column(String, nullable=True)
 
-    # Relationship: A snapshot consists of multiple entries (one per account)
+    # Relationship: A snapshot consists of multiple entries (one per account).
+    # Entries are always wanted with their snapshot, so load them for a whole
+    # batch of snapshots in one extra SELECT ... IN rather than one per snapshot
     entries = relationship(
-        "SnapshotEntry", back_populates="snapshot", cascade="all, delete-orphan"
+        "SnapshotEntry",
+        back_populates="snapshot",
+        cascade="all, delete-orphan",
+        lazy="selectin",
     )
 
     def __repr__(self):
@@ -106,60 +274,233 @@ class Snapshot(Base):
 
 class SnapshotEntry(Base):
     __tablename__ = "snapshot_entries"
+    __table_args__ = (
+        # Covers the "latest balance per account" lookup (AccountsScreen):
+        # account_id -> snapshot_id -> balance without touching the table rows
+        Index("ix_snapshot_entries_account_snapshot", "account_id", "snapshot_id", "balance"),
+    )
     id = Column(Integer, primary_key=True, index=True)
     snapshot_id = Column(
         Integer, ForeignKey("snapshots.id"), nullable=False, index=True
     )
     account_id = Column(Integer, ForeignKey("accounts.id"), nullable=False, index=True)
-    balance = Column(Float, nullable=False)
+    balance = Column(Integer, nullable=False)  # Whole cents, like Transaction.amount
+
+    # Relationships (see Transaction for why these raise instead of lazy-loading)
+    snapshot = relationship("Snapshot", back_populates="entries", lazy="raise_on_sql")
+    account = relationship("Account", back_populates="snapshots", lazy="raise_on_sql")
 
-    # Relationships
-    snapshot = relationship("Snapshot", back_populates="entries")
-    account = relationship("Account", back_populates="snapshots")
+    @hybrid_property
+    def balance_dollars(self):
+        """The balance in dollars, for display; usable in queries too."""
+        return self.balance / 100.0
 
     def __repr__(self):
         return f"<SnapshotEntry(id={self.id}, snapshot_id={self.snapshot_id}, account_id={self.account_id}, balance={self.balance})>"
 
 
 # --- Utility Function ---
+# Bump whenever the tables, indexes or default rows init_db() sets up change.
+# A completed init_db() stores it in the file's PRAGMA user_version, so later
+# launches can tell the database is already set up without checking it.
+SCHEMA_VERSION = 3
+
+# Id of the reserved "Uncategorized" category, filled in by init_db()
+_uncategorized_id = None
+
+
+def uncategorized_id():
+    """Returns the id of the reserved 'Uncategorized' category (None before init_db)."""
+    return _uncategorized_id
+
+
+# Largest value a SQLite INTEGER column holds
+_MAX_CENTS = 2**63 - 1
+
+
+def dollars_to_cents(amount):
+    """
+    Converts a dollar amount (numeric string or number) to the whole cents
+    stored in amount/balance columns, rounding halves away from zero.
+    Raises ValueError for anything that isn't a finite number.
+    """
+    # Decimal works on the digits as written (str() of a float is its shortest
+    # repr), so "-1.005" gives -101 rather than binary float's -100
+    try:
+        dollars = Decimal(str(amount))
+        if dollars.is_finite():
+            cents = int((dollars * 100).quantize(Decimal(1), rounding=ROUND_HALF_UP))
+            if -_MAX_CENTS <= cents <= _MAX_CENTS:
+                return cents
+    except ArithmeticError:  # decimal.InvalidOperation (bad text), decimal.Overflow
+        pass
+    raise ValueError(f"Not a valid amount: {amount!r}")
+
+
+# --- Schema migrations ---
+def _rebuild_table(conn, table, column_exprs):
+    """
+    Recreates `table` from its current model definition and copies the rows
+    over, selecting column_exprs[name] (raw SQL) instead of the plain column
+    where given. SQLite can't change a column's type in place.
+    """
+    old_name = f"_old_{table.name}"
+    conn.exec_driver_sql(f"ALTER TABLE {table.name} RENAME TO {old_name}")
+    # Index names are database-wide, and the renamed table still holds them
+    for index in table.indexes:
+        conn.exec_driver_sql(f"DROP INDEX IF EXISTS {index.name}")
+    table.create(conn)
+    names = [column.name for column in table.columns]
+    conn.exec_driver_sql(
+        f"INSERT INTO {table.name} ({', '.join(names)}) "
+        f"SELECT {', '.join(column_exprs.get(n, n) for n in names)} FROM {old_name}"
+    )
+    conn.exec_driver_sql(f"DROP TABLE {old_name}")
+
+
+def _migrate_to_cents(conn):
+    """Version 2: amounts and balances are stored as integer cents, not floats."""
+    # Convert with the same rounding as new input gets; a value it rejects
+    # makes the copy fail and the migration roll back
+    conn.connection.driver_connection.create_function(
+        "dollars_to_cents", 1, dollars_to_cents, deterministic=True
+    )
+    _rebuild_table(
+        conn,
+        Transaction.__table__,
+        {"amount": "dollars_to_cents(amount)"},
+    )
+    _rebuild_table(
+        conn,
+        SnapshotEntry.__table__,
+        {"balance": "dollars_to_cents(balance)"},
+    )
+
+
+def _migrate_to_epoch_days(conn):
+    """Version 3: transaction dates are stored as integer days (see EpochDay)."""
+    # 2440587.5 is julianday('1970-01-01')
+    _rebuild_table(
+        conn,
+        Transaction.__table__,
+        {"date": "CAST(julianday(date) - 2440587.5 AS INTEGER)"},
+    )
+
+
+# Migration functions by the schema version they upgrade a database to
+_MIGRATIONS = {
+    2: _migrate_to_cents,
+    3: _migrate_to_epoch_days,
+}
+
+
+def _migrate(db_version):
+    """
+    Brings an existing database at db_version up to SCHEMA_VERSION, one
+    version per transaction. Follows SQLite's documented table-rebuild
+    procedure: foreign keys off, rebuild inside an explicit BEGIN, then
+    PRAGMA foreign_key_check before the version bump and COMMIT. A failed
+    step rolls back to the previous version with every row in place.
+    """
+    # pysqlite would otherwise commit around the DDL on its own; with the
+    # driver in autocommit mode the BEGIN/COMMIT below are the only ones
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        if not inspect(conn).has_table(Transaction.__tablename__):
+            return  # New file: create_all() builds the current schema directly
+        # Must be set outside a transaction (it is a no-op inside one)
+        conn.exec_driver_sql("PRAGMA foreign_keys=OFF")
+        try:
+            # Files written before user_version was kept have the version 1 schema
+            for version in range(max(db_version, 1) + 1, SCHEMA_VERSION + 1):
+                print(f"Migrating database to schema version {version}...")
+                conn.exec_driver_sql("BEGIN")
+                try:
+                    _MIGRATIONS[version](conn)
+                    violations = conn.exec_driver_sql(
+                        "PRAGMA foreign_key_check"
+                    ).all()
+                    if violations:
+                        raise RuntimeError(
+                            f"Migration to version {version} aborted, "
+                            f"foreign key violations (table, rowid, parent): "
+                            f"{[tuple(v[:3]) for v in violations[:10]]}"
+                        )
+                    conn.exec_driver_sql(f"PRAGMA user_version = {version}")
+                    conn.exec_driver_sql("COMMIT")
+                except Exception:
+                    conn.exec_driver_sql("ROLLBACK")
+                    raise
+        finally:
+            conn.exec_driver_sql("PRAGMA foreign_keys=ON")
+
+
 def init_db():
     """Creates database tables if they don't exist and adds default data conditionally."""
+    global _uncategorized_id
     print("Initializing database...")
     try:
+        # Fast path: a database already set up for this schema version only
+        # needs the reserved category's id, not create_all() and default checks
+        with engine.connect() as conn:
+            db_version = conn.exec_driver_sql("PRAGMA user_version").scalar()
+            if db_version == SCHEMA_VERSION:
+                known_uncategorized_id = conn.execute(
+                    select(Category.id).where(Category.name == "Uncategorized")
+                ).scalar()
+                if known_uncategorized_id is not None:
+                    _uncategorized_id = known_uncategorized_id
+                    print("Database schema is up to date.")
+                    return
+
+        if db_version < SCHEMA_VERSION:
+            _migrate(db_version)
+
         # Ensure all tables defined in Base are created if they don't exist
         Base.metadata.create_all(bind=engine)
+        # create_all() skips indexes added to tables that already exist
+        for index in SnapshotEntry.__table__.indexes:
+            index.create(bind=engine, checkfirst=True)
         print("Database tables checked/created.")
 
         # Use a session to check and potentially add default data
         with SessionLocal() as db:
             # --- 1. Ensure default category exists (usually always needed) ---
             uncategorized_added = False
-            uncategorized_exists = (
-                db.query(Category).filter(Category.name == "Uncategorized").count() > 0
-            )
+            # Fetch the id rather than COUNT(*): the unique name index finds
+            # the row directly, and step 5 reuses the result
+            existing_uncategorized_id = db.execute(
+                select(Category.id).where(Category.name == "Uncategorized")
+            ).scalar()
+            uncategorized_exists = existing_uncategorized_id is not None
             if not uncategorized_exists:
                 print("Adding default 'Uncategorized' category...")
-                default_cat = Category(name="Uncategorized")
-                db.add(default_cat)
+                # Core INSERT ... RETURNING hands back the id in the same
+                # statement, so step 5 needs no follow-up SELECT
+                existing_uncategorized_id = db.execute(
+                    insert(Category).values(name="Uncategorized").returning(Category.id)
+                ).scalar_one()
                 uncategorized_added = True # Mark that we added it
 
-            # --- 2. Check if ANY accounts exist ---
-            total_account_count = db.query(Account).count()
+            # --- 2. Check if ANY accounts exist (LIMIT 1, no full COUNT) ---
+            accounts_exist = (
+                db.execute(select(Account.id).limit(1)).first() is not None
+            )
             defaults_added = False # Flag to track if we add defaults in this run
 
             # --- 3. Add default accounts ONLY if NO accounts exist ---
-            if total_account_count == 0:
+            if not accounts_exist:
                 print("No accounts found. Adding default accounts...")
                 default_account_names = ["Cash", "Checking", "Savings", "Brokerage"]
-                for acc_name in default_account_names:
-                    # Since we know the table is empty, no need for individual checks
-                    print(f"Adding default account: '{acc_name}'...")
-                    default_acc = Account(name=acc_name)
-                    db.add(default_acc)
+                print(f"Adding default accounts: {default_account_names}")
+                # Since we know the table is empty, no need for individual checks;
+                # one executemany INSERT instead of an ORM object per account
+                db.execute(
+                    insert(Account), [{"name": name} for name in default_account_names]
+                )
                 defaults_added = True # Mark that we added the block of defaults
             else:
                 # If accounts already exist, skip adding defaults
-                print(f"Found {total_account_count} existing account(s). Skipping default account creation.")
+                print("Existing accounts found. Skipping default account creation.")
 
             # --- 4. Commit if any changes were made ---
             if uncategorized_added or defaults_added:
@@ -167,15 +508,48 @@ def init_db():
                 print("Default data checked/added.")
             else:
                 # Provide feedback if nothing was added
-                if uncategorized_exists and total_account_count > 0:
+                if uncategorized_exists and accounts_exist:
                     print("Default category and existing accounts found. No default data added.")
                 elif uncategorized_exists:
                      print("Default category found. No default accounts added (table was empty).") # Should not happen with current logic but safe
                 # Add other conditions if needed
 
+            # --- 5. Remember the reserved category's id for the screens ---
+            _uncategorized_id = existing_uncategorized_id
+
+        # --- 6. Give the query planner statistics on a database that has none ---
+        # Afterwards optimize_db() keeps them current; a full ANALYZE per
+        # launch would rescan every index for nothing.
+        with engine.connect() as conn:
+            has_stats = conn.exec_driver_sql(
+                "SELECT 1 FROM sqlite_master WHERE name = 'sqlite_stat1'"
+            ).first()
+            if has_stats is None:
+                print("Analyzing database for the query planner...")
+                conn.exec_driver_sql("ANALYZE")
+
+            # --- 7. Mark the database as set up so later launches take the fast path ---
+            conn.exec_driver_sql(f"PRAGMA user_version = {SCHEMA_VERSION}")
+            conn.commit()
+
     except Exception as e:
         print(f"Error during database initialization: {e}")
         # Rollback might be needed if error occurred mid-session, but context manager handles it
+    finally:
+        # Even after a failure, so screens stop waiting and report their own errors
+        DB_READY.set()
+
+
+def optimize_db():
+    """
+    Lets SQLite re-ANALYZE tables whose planner statistics have gone stale.
+    Cheap when nothing changed; call after bulk writes and on shutdown.
+    """
+    with engine.connect() as conn:
+        # Caps the rows sampled per index so this stays quick on large tables
+        conn.exec_driver_sql("PRAGMA analysis_limit=400")
+        conn.exec_driver_sql("PRAGMA optimize")
+        conn.commit()
 
 
 if __name__ == "__main__":
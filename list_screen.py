@@ -0,0 +1,90 @@
+import bisect
+
+from kivy.clock import Clock
+from kivy.logger import Logger
+
+from database import SessionLocal, DB_EXECUTOR
+
+
+class RecycleListScreenMixin:
+    """
+    Shared plumbing for the management screens that list rows in a RecycleView.
+
+    Subclasses set the class attributes below and keep two attributes:
+    _selected_idx (index of the selected row, or None) and _id_index
+    ({row id: index in the RecycleView data}).
+    """
+
+    # Name of the ObjectProperty holding the RecycleView
+    recycle_view_attr = None
+    # Keys of the row id and display name in each data dict
+    row_id_key = None
+    row_name_key = None
+    # Title for Kivy Logger messages, e.g. "AccountManagement"
+    log_title = None
+
+    @property
+    def _rows(self):
+        return getattr(self, self.recycle_view_attr).data
+
+    def _run_in_background(self, work, on_done):
+        """
+        Runs work(db) on DB_EXECUTOR with its own session, then calls
+        on_done(result, error) back on the UI thread via the Clock.
+        """
+
+        def runner():
+            result, error = None, None
+            try:
+                with SessionLocal() as db:
+                    result = work(db)
+            except Exception as e:
+                Logger.exception("%s: Background DB operation failed", self.log_title)
+                error = e
+            Clock.schedule_once(lambda dt: on_done(result, error), 0)
+
+        DB_EXECUTOR.submit(runner)
+
+    def _set_status(self, text):
+        """Sets the status label text, skipping the texture re-render if it's unchanged."""
+        if self.status_label and self.status_label.text != text:
+            self.status_label.text = text
+
+    def _set_row_selected(self, idx, selected):
+        """
+        Sets the selected flag of row idx. A new dict is assigned to data[idx]
+        so the RecycleView sees a single-item change and updates from it.
+        """
+        data = self._rows
+        data[idx] = {**data[idx], "selected": selected}
+
+    def _reindex_rows(self, start=0):
+        """Refreshes the id->index map for rows from `start` to the end of the data."""
+        data = self._rows
+        for idx in range(start, len(data)):
+            self._id_index[data[idx][self.row_id_key]] = idx
+
+    def _insert_row(self, item_data):
+        """Inserts a row into the RecycleView data, keeping it sorted by name."""
+        data = self._rows
+        name_key = self.row_name_key
+        idx = bisect.bisect_left(data, item_data[name_key], key=lambda d: d[name_key])
+        data.insert(idx, item_data)
+        self._reindex_rows(idx)
+        # Keep the selected index pointing at the same row
+        if item_data["selected"]:
+            self._selected_idx = idx
+        elif self._selected_idx is not None and idx <= self._selected_idx:
+            self._selected_idx += 1
+
+    def _remove_row(self, idx):
+        """Removes and returns the row at idx, keeping the selected index in step."""
+        item_data = self._rows.pop(idx)
+        del self._id_index[item_data[self.row_id_key]]
+        self._reindex_rows(idx)
+        if self._selected_idx is not None:
+            if idx == self._selected_idx:
+                self._selected_idx = None
+            elif idx < self._selected_idx:
+                self._selected_idx -= 1
+        return item_data
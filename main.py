@@ -1,26 +1,95 @@
+from contextlib import ExitStack
+
 from kivy.app import App
+from kivy.factory import Factory
+from kivy.logger import Logger
 from kivy.uix.screenmanager import ScreenManager
 
-from database import init_db
+from database import (
+    init_db,
+    optimize_db,
+    engine,
+    DB_EXECUTOR,
+    DEBUG_QUERY_COUNTS,
+    count_queries,
+)
 
-from account_management_screen import AccountManagementScreen
-from category_management_screen import CategoryManagementScreen
 from account_screen import AccountsScreen
-from budget_screen import BudgetScreen
+
+# Screens other than the start screen, by name: (class name, module).
+# Their modules are only imported, and the screens only built, the first time
+# they are navigated to; Factory.register makes Kivy import the module when
+# the class is first looked up.
+LAZY_SCREENS = {
+    "budget": ("BudgetScreen", "budget_screen"),
+    "account_management": ("AccountManagementScreen", "account_management_screen"),
+    "category_management": ("CategoryManagementScreen", "category_management_screen"),
+}
+for _class_name, _module in LAZY_SCREENS.values():
+    Factory.register(_class_name, module=_module)
 
 
 # --- Screen Manager ---
 class MyScreenManager(ScreenManager):
-    pass
+    # count_queries() scope open for the current screen, and its statement list
+    _query_scope = None
+    _screen_queries = None
+
+    def on_current(self, instance, value):
+        leaving = self.current_screen
+        if DEBUG_QUERY_COUNTS and (self._query_scope is None or leaving.name != value):
+            if self._query_scope is not None:
+                # Includes the background queries the screen started while shown
+                self._query_scope.close()
+                Logger.info(
+                    "QueryCount: %d queries while on '%s'",
+                    len(self._screen_queries),
+                    leaving.name,
+                )
+            self._query_scope = ExitStack()
+            self._screen_queries = self._query_scope.enter_context(
+                count_queries(all_threads=True)
+            )
+        # Build a lazily loaded screen the first time it is switched to
+        if value in LAZY_SCREENS and not self.has_screen(value):
+            class_name, _module = LAZY_SCREENS[value]
+            self.add_widget(Factory.get(class_name)(name=value))
+        super().on_current(instance, value)
 
 
 # --- Main App Class ---
 class BudgetApp(App):
+    # Set once on_stop has shut the DB worker down
+    _db_closed = False
+
     def build(self):
-        init_db()  # Create database tables if they don't exist
+        # Create database tables if they don't exist. Runs as the DB worker's
+        # first job so the first frame isn't held up by opening the database;
+        # screens' background queries queue up behind it.
+        DB_EXECUTOR.submit(init_db)
         sm = MyScreenManager()
         return sm
 
+    def on_stop(self):
+        # App.stop() followed by the end of run() dispatches on_stop twice
+        if self._db_closed:
+            return
+        self._db_closed = True
+        # Queued on the DB worker so it runs after any import still writing
+        # instead of racing it for the write lock
+        DB_EXECUTOR.submit(self._optimize_db)
+        DB_EXECUTOR.shutdown(wait=True)
+        # Closing the last connection checkpoints the WAL back into budget.db
+        # (the only database file main.spec bundles)
+        engine.dispose()
+
+    def _optimize_db(self):
+        """Refreshes query planner statistics; runs on the DB worker."""
+        try:
+            optimize_db()
+        except Exception:
+            Logger.exception("BudgetApp: Refreshing planner statistics failed")
+
 
 # --- Run the App ---
 if __name__ == "__main__":
@@ -8,6 +8,10 @@ a = Analysis(
     datas=[('budget.db', '.')],
     hiddenimports=[
         'sqlalchemy.dialects.sqlite', # For SQLAlchemy SQLite support
+        # Screen modules main.py only imports lazily (LAZY_SCREENS)
+        'budget_screen',
+        'account_management_screen',
+        'category_management_screen',
         'kivy.deps.sdl2',
         'kivy.deps.glew',
     ],